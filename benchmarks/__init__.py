@@ -0,0 +1,10 @@
+#####
+# Benchmarks for TimelyTrack
+#
+# Run from the repository root, e.g.:
+#   python -m benchmarks.bench_reader_memory --lines 2000000
+#   python -m benchmarks.bench_reports --days 30,365,1825 --output results.json
+#
+# python -m benchmarks.synthetic writes a projects.txt/time_log.txt pair
+# of any size to try the menus on.
+#####
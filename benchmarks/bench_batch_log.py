@@ -0,0 +1,43 @@
+#####
+# purpose: measures batch logging throughput, entries per second written
+#          through log_entries in one buffered write
+# usage: python -m benchmarks.bench_batch_log --entries 1000000 --storage text
+#####
+import argparse
+import os
+import tempfile
+import time
+
+import timely_track
+from benchmarks import synthetic
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=1000000)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--storage', choices=sorted(timely_track.STORAGE_BACKENDS), default='text')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.environ['TIMELYTRACK_STORAGE'] = args.storage
+        timely_track.check_files()
+
+        projects = synthetic.project_names(args.projects)
+        for project in projects:
+            timely_track.save_project(project)
+
+        entries_per_day = 20
+        records = list(synthetic.synthetic_entries(projects, args.entries // entries_per_day + 1,
+                                                   entries_per_day))[:args.entries]
+
+        start = time.perf_counter()
+        count = timely_track.log_entries(records)
+        elapsed = time.perf_counter() - start
+        print(f'{args.storage}: {count} entries in {elapsed:.2f} s, {count / elapsed:,.0f} entries/s')
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#####
+# purpose: measures how long command line calls take from process start
+#          to exit, next to a bare interpreter start for comparison
+# usage: python -m benchmarks.bench_cli_startup --runs 20
+#####
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import timely_track
+from benchmarks import synthetic
+
+#####
+# purpose: runs a command several times and keeps the median wall time
+# inputs: argument list, number of runs
+# returns: median seconds
+#####
+def median_time(command, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+
+    script = os.path.abspath(timely_track.__file__)
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        projects = synthetic.project_names(20)
+        synthetic.write_projects(timely_track.PROJECTS_FILE, projects)
+        synthetic.write_time_log(timely_track.TIME_LOG_FILE,
+                                 synthetic.synthetic_entries(projects, args.days, 10))
+
+        # run as a script the module is compiled on every start, with -m
+        # its cached bytecode is used
+        os.environ['PYTHONPATH'] = os.path.dirname(script)
+        print(f'{"python -c pass":<34}{median_time([sys.executable, "-c", "pass"], args.runs) * 1000:8.1f} ms')
+        month_start = timely_track.datetime.date.today().strftime('%Y-%m-01')
+        commands = (
+            ('status', ['status']),
+            ('log', ['log', projects[0], '0.25', '-m', 'bench']),
+            ('report', ['report']),
+            ('report --since', ['report', '--since', month_start]),
+        )
+        for launcher, prefix in (('timely_track.py', [script]), ('-m timely_track', ['-m', 'timely_track'])):
+            for name, command in commands:
+                elapsed = median_time([sys.executable] + prefix + command, args.runs)
+                print(f'{launcher + " " + name:<34}{elapsed * 1000:8.1f} ms')
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#####
+# purpose: compares the text log parsers with the columnar entry store for
+#          per-project and per-day totals
+# usage: python -m benchmarks.bench_columnar --days 5000 --entries-per-day 20
+#####
+import argparse
+import os
+import tempfile
+import time
+
+import timely_track
+from benchmarks import synthetic
+
+#####
+# purpose: runs a function and returns its wall time
+# inputs: function
+#####
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--days', type=int, default=5000)
+    parser.add_argument('--entries-per-day', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        projects = synthetic.project_names(args.projects)
+        synthetic.write_projects(timely_track.PROJECTS_FILE, projects)
+        entries = synthetic.synthetic_entries(projects, args.days, args.entries_per_day)
+        count = synthetic.write_time_log(timely_track.TIME_LOG_FILE, entries)
+
+        columnar = timely_track.ColumnarStorage()
+        convert = timed(columnar.import_text_files)
+        numpy = 'NumPy' if timely_track.load_numpy() else 'struct fallback, NumPy not installed'
+        print(f'{count} entries, converted in {convert:.2f} s ({numpy})')
+
+        results = (
+            ('text parser, project totals', timed(lambda: timely_track.aggregate_time_log())),
+            ('columnar, project totals', timed(columnar.project_totals)),
+            ('columnar, daily totals', timed(columnar.daily_totals)),
+        )
+        for name, elapsed in results:
+            print(f'{name:<30}{elapsed * 1000:>10.1f} ms')
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+
+if __name__ == '__main__':
+    main()
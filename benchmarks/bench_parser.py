@@ -0,0 +1,74 @@
+#####
+# purpose: measures parse throughput, lines per second through parse_entry
+#          for the tab separated format and the older ' - ' separated one,
+#          after checking awkward fields survive a write and read back
+# usage: python -m benchmarks.bench_parser --lines 1000000
+#####
+import argparse
+import time
+
+import log_parser
+from benchmarks import synthetic
+
+#####
+# fields with the characters the tab separated format escapes
+#####
+AWKWARD_FIELDS = ('plain', 'a\tb', 'line\nbreak', 'cr\r', 'back\\slash', '\\t not a tab',
+                  'trailing\\', 'Client: A - B', '')
+
+#####
+# purpose: checks escape_field/unescape_field and format_entry/parse_entry
+#          give back what went in, and that an older line with a tab in its
+#          comment is still read
+# inputs: none
+#####
+def check_round_trip():
+    for field in AWKWARD_FIELDS:
+        escaped = log_parser.escape_field(field)
+        if '\t' in escaped or '\n' in escaped or log_parser.unescape_field(escaped) != field:
+            raise AssertionError(f'escape round trip failed for {field!r}: {escaped!r}')
+        entry = ('2024-01-31', field or 'project', 1.5, field or None)
+        parsed = log_parser.parse_entry(log_parser.format_entry(*entry))
+        if parsed != entry:
+            raise AssertionError(f'entry round trip failed: {entry!r} read back as {parsed!r}')
+
+    legacy = '2023-05-01 - Client: 1.5 hours - called\tabout invoice'
+    if log_parser.parse_entry(legacy) != ('2023-05-01', 'Client', 1.5, 'called\tabout invoice'):
+        raise AssertionError(f'older line with a tab not read: {legacy!r}')
+
+#####
+# purpose: parses every line a few times and keeps the best wall time
+# inputs: lines, number of repeats
+#####
+def best_parse_time(lines, repeats=3):
+    parse_entry = log_parser.parse_entry
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for line in lines:
+            parse_entry(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--projects', type=int, default=50)
+    args = parser.parse_args()
+
+    check_round_trip()
+    projects = synthetic.project_names(args.projects)
+    entries_per_day = 20
+    entries = list(synthetic.synthetic_entries(projects, args.lines // entries_per_day + 1,
+                                               entries_per_day))[:args.lines]
+
+    formats = (('tab separated', log_parser.format_entry),
+               ('legacy', log_parser.format_legacy_entry))
+    for name, format_line in formats:
+        lines = [format_line(*entry) for entry in entries]
+        elapsed = best_parse_time(lines)
+        print(f'{name:<14}{len(lines)} lines in {elapsed:.2f} s, {len(lines) / elapsed:,.0f} lines/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#####
+# purpose: times range totals answered from per-project running sums
+#          against the storage's project_totals and a rescan of the log
+# usage: python -m benchmarks.bench_range_totals --days 3650 --queries 1000
+#####
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import timely_track
+from benchmarks import synthetic
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--days', type=int, default=3650)
+    parser.add_argument('--entries-per-day', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        projects = synthetic.project_names(args.projects)
+        synthetic.write_projects(timely_track.PROJECTS_FILE, projects)
+        entries = synthetic.synthetic_entries(projects, args.days, args.entries_per_day)
+        count = synthetic.write_time_log(timely_track.TIME_LOG_FILE, entries)
+        storage = timely_track.TextStorage()
+        # build the report cache outside the timings
+        storage.daily_totals()
+
+        start = time.perf_counter()
+        range_totals = timely_track.RangeTotals(storage.daily_totals())
+        print(f'{count} entries, running sums built in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+        rng = random.Random(0)
+        dates = sorted(storage.daily_totals())
+        ranges = [sorted((rng.choice(dates), rng.choice(dates))) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        for first, last in ranges:
+            range_totals.totals(first, last)
+        prefix_time = (time.perf_counter() - start) / len(ranges)
+
+        start = time.perf_counter()
+        for first, last in ranges:
+            storage.project_totals(first, last)
+        cache_time = (time.perf_counter() - start) / len(ranges)
+
+        # a rescan is slow, time a few
+        rescans = ranges[:5]
+        start = time.perf_counter()
+        for first, last in rescans:
+            timely_track.sum_shard(timely_track.TIME_LOG_FILE, first, last)
+        rescan_time = (time.perf_counter() - start) / len(rescans)
+
+        print(f'per range: running sums {prefix_time * 1e6:.1f} us, '
+              f'cached daily totals {cache_time * 1e3:.2f} ms, log rescan {rescan_time * 1e3:.1f} ms')
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+
+if __name__ == '__main__':
+    main()
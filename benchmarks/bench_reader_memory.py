@@ -0,0 +1,86 @@
+#####
+# purpose: compares peak memory of the old readlines() report path with
+#          the streaming time log reader on a synthetic log, written in
+#          the older ' - ' format the readlines() path parsed
+# usage: python -m benchmarks.bench_reader_memory --lines 2000000
+#####
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import timely_track
+from benchmarks import synthetic
+
+#####
+# purpose: totals per project the way the reports did before streaming
+# inputs: none
+#####
+def readlines_totals():
+    with open(timely_track.TIME_LOG_FILE, 'r') as file:
+        time_log = file.readlines()
+
+    total_time_worked = {}
+    for entry in time_log:
+        parts = entry.strip().split(' - ', 1)
+        if len(parts) == 2:
+            project, hours = parts[1].split(': ', 1)
+            hours = float(hours.split()[0])
+            total_time_worked[project] = total_time_worked.get(project, 0) + hours
+    return total_time_worked
+
+#####
+# purpose: totals per project with the streaming reader
+# inputs: none
+#####
+def streaming_totals():
+    total_time_worked = {}
+    for date, project, hours, comment in timely_track.read_time_log():
+        total_time_worked[project] = total_time_worked.get(project, 0) + hours
+    return total_time_worked
+
+#####
+# purpose: runs a function under tracemalloc
+# inputs: function to measure
+# returns: (seconds, peak bytes, result)
+#####
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=2000000)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--entries-per-day', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        projects = synthetic.project_names(args.projects)
+        days = max(1, args.lines // args.entries_per_day)
+        entries = synthetic.synthetic_entries(projects, days, args.entries_per_day)
+        count = synthetic.write_time_log(timely_track.TIME_LOG_FILE, entries, legacy=True)
+        size = os.path.getsize(timely_track.TIME_LOG_FILE)
+        print(f'{count} entries, {size / 2**20:.1f} MiB')
+
+        results = {}
+        for name, function in (('readlines', readlines_totals),
+                               ('streaming', streaming_totals)):
+            elapsed, peak, results[name] = measure(function)
+            print(f'{name:>10}: {elapsed:8.2f} s  peak {peak / 2**20:10.1f} MiB')
+
+        if results['readlines'] != results['streaming']:
+            print('warning: totals differ between the two paths')
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+#####
+# purpose: times the hot paths (list_projects and the display_* reports)
+#          on synthetic data of growing size, with input() answered from
+#          a script and screen output thrown away. Reports wall time and
+#          peak traced memory per size, and saves the results as JSON to
+#          compare against a run of another version.
+# usage: python -m benchmarks.bench_reports --days 30,365,1825 --output after.json
+#        python -m benchmarks.bench_reports --days 30,365,1825 --compare before.json
+#####
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import timely_track
+from benchmarks import synthetic
+
+#####
+# pages of the time log paged through before going back
+#####
+TIME_LOG_PAGES = 10
+
+#####
+# hot paths with the answers they are given at each input() prompt
+#####
+REPORTS = (
+    ('list_projects', timely_track.list_projects, []),
+    ('display_total_time_worked', timely_track.display_total_time_worked, ['']),
+    ('display_today_totals', timely_track.display_today_totals, ['']),
+    ('display_historic_totals', timely_track.display_historic_totals, ['']),
+    ('display_time_log', timely_track.display_time_log, [''] * (TIME_LOG_PAGES - 1) + ['0']),
+)
+
+#####
+# purpose: runs a function with input() answered in order and stdout sent
+#          to the null device
+# inputs: function, answers, cold to drop the in-process caches first
+#####
+def run_quietly(function, answers, cold):
+    if cold:
+        timely_track._storage = None
+        timely_track._registry = None
+        timely_track._range_totals = None
+    replies = iter(answers)
+    saved_input = builtins.input
+    # anything unexpected backs out of the menu
+    builtins.input = lambda prompt='': next(replies, '0')
+    try:
+        with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+            function()
+    finally:
+        builtins.input = saved_input
+
+#####
+# purpose: times a report and measures its peak memory in a separate run,
+#          tracing slows the code down too much to time it at the same time
+# inputs: function, answers, repeats, cold as for run_quietly
+# returns: best wall seconds, peak traced bytes
+#####
+def measure(function, answers, repeats, cold):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run_quietly(function, answers, cold)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        run_quietly(function, answers, cold)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+#####
+# purpose: runs every report on a freshly generated log
+# inputs: parsed arguments, number of days
+# returns: list of result dicts
+#####
+def run_size(args, days):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        projects = synthetic.project_names(args.projects)
+        synthetic.write_projects(timely_track.PROJECTS_FILE, projects)
+        entries = synthetic.synthetic_entries(projects, days, args.entries_per_day, args.comment_words,
+                                              start=synthetic.start_for_today(days))
+        count = synthetic.write_time_log(timely_track.TIME_LOG_FILE, entries)
+        timely_track._storage = None
+        timely_track._registry = None
+        timely_track._range_totals = None
+        if args.storage != 'text':
+            timely_track.get_storage().import_text_files()
+        # build the report cache so every report starts from the same state
+        timely_track.get_storage().project_totals()
+
+        log_bytes = os.path.getsize(timely_track.TIME_LOG_FILE)
+        for name, function, answers in REPORTS:
+            wall, peak = measure(function, answers, args.repeats, args.cold)
+            results.append({'function': name, 'days': days, 'entries': count, 'log_bytes': log_bytes,
+                            'wall_seconds': wall, 'peak_bytes': peak})
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+    return results
+
+#####
+# purpose: prints wall time and peak memory per report for each size,
+#          with how much each grew from the smallest size
+# inputs: result dicts
+#####
+def print_results(results):
+    sizes = sorted({result['days'] for result in results})
+    by_key = {(result['function'], result['days']): result for result in results}
+    header = ''.join(f'{f"{days} days":>24}' for days in sizes)
+    print(f'{"":<28}{header}')
+    for name, function, answers in REPORTS:
+        cells = []
+        base = by_key[name, sizes[0]]['wall_seconds']
+        for days in sizes:
+            result = by_key[name, days]
+            growth = result['wall_seconds'] / base if base else 0
+            cells.append(f'{result["wall_seconds"] * 1000:9.2f} ms {result["peak_bytes"] / 1024:7.0f} KiB'
+                         + (f' x{growth:.0f}' if days != sizes[0] else '   '))
+        print(f'{name:<28}' + ''.join(f'{cell:>24}' for cell in cells))
+
+#####
+# purpose: prints the wall time and peak memory ratios against a saved run
+# inputs: result dicts, saved JSON path
+#####
+def print_comparison(results, path):
+    with open(path, 'r') as file:
+        saved = json.load(file)
+    before = {(result['function'], result['days']): result for result in saved['results']}
+    print(f'\ncompared with {saved.get("label") or path} (after / before)')
+    for result in results:
+        old = before.get((result['function'], result['days']))
+        if old is None:
+            continue
+        wall = result['wall_seconds'] / old['wall_seconds'] if old['wall_seconds'] else 0
+        memory = result['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else 0
+        print(f'{result["function"]:<28}{result["days"]:>6} days  wall x{wall:.2f}  memory x{memory:.2f}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', default='30,365,1825', help='comma separated log lengths')
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--entries-per-day', type=int, default=20)
+    parser.add_argument('--comment-words', type=int, default=3)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--cold', action='store_true', help='drop in-process caches before every run')
+    parser.add_argument('--storage', choices=sorted(timely_track.STORAGE_BACKENDS), default='text')
+    parser.add_argument('--label', help='name for this run in the JSON, e.g. a version')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file from an earlier run to compare with')
+    args = parser.parse_args()
+
+    os.environ['TIMELYTRACK_STORAGE'] = args.storage
+    results = []
+    for days in sorted(int(days) for days in args.days.split(',')):
+        results.extend(run_size(args, days))
+
+    print_results(results)
+    if args.compare:
+        print_comparison(results, args.compare)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'label': args.label, 'python': platform.python_version(),
+                       'platform': platform.platform(), 'storage': args.storage,
+                       'settings': {'projects': args.projects, 'entries_per_day': args.entries_per_day,
+                                    'comment_words': args.comment_words, 'repeats': args.repeats,
+                                    'cold': args.cold},
+                       'results': results}, file, indent=2)
+        print(f'\nresults saved to {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#####
+# purpose: times reports on the sharded backend, all-time totals summed
+#          shard by shard in one process against the process pool, and a
+#          one-month report against a full scan of time_log.txt, and
+#          all-time totals served from closed-month rollups
+# usage: python -m benchmarks.bench_shards --days 3650 --entries-per-day 100
+#####
+import argparse
+import os
+import tempfile
+import time
+
+import timely_track
+from benchmarks import synthetic
+from benchmarks.bench_storage import best_time
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--days', type=int, default=3650)
+    parser.add_argument('--entries-per-day', type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        projects = synthetic.project_names(args.projects)
+        synthetic.write_projects(timely_track.PROJECTS_FILE, projects)
+        entries = synthetic.synthetic_entries(projects, args.days, args.entries_per_day)
+        count = synthetic.write_time_log(timely_track.TIME_LOG_FILE, entries)
+
+        sharded = timely_track.ShardedStorage()
+        start = time.perf_counter()
+        sharded.import_text_files()
+        shards = len(sharded.load_manifest()['shards'])
+        print(f'{count} entries, {shards} shards, migration {time.perf_counter() - start:.2f} s')
+
+        # full rescans first, rollups would hide the cost being measured
+        timely_track.SHARD_ROLLUPS = False
+        parallel_min = timely_track.SHARD_PARALLEL_MIN_ENTRIES
+        timely_track.SHARD_PARALLEL_MIN_ENTRIES = count + 1
+        sequential = best_time(sharded.project_totals)
+        timely_track.SHARD_PARALLEL_MIN_ENTRIES = 0
+        parallel = best_time(sharded.project_totals)
+        timely_track.SHARD_PARALLEL_MIN_ENTRIES = parallel_min
+        print(f'all-time totals: one process {sequential:.3f} s, '
+              f'{os.cpu_count()} CPUs {parallel:.3f} s ({sequential / parallel:.1f}x)')
+
+        # last full month, without the report cache the text backend scans the whole log
+        last_month = max(sharded.load_manifest()['shards'])
+        start_date, end_date = last_month + '-01', last_month + '-31'
+        text_time = best_time(lambda: timely_track.sum_shard(timely_track.TIME_LOG_FILE, start_date, end_date))
+        shard_time = best_time(lambda: sharded.project_totals(start_date, end_date))
+        print(f'one-month totals: full log {text_time:.3f} s, shards {shard_time:.3f} s')
+
+        timely_track.SHARD_ROLLUPS = True
+        start = time.perf_counter()
+        sharded.project_totals()
+        cold = time.perf_counter() - start
+        warm = best_time(sharded.project_totals)
+        print(f'all-time totals with rollups: building {cold:.3f} s, from rollups {warm:.4f} s')
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+
+if __name__ == '__main__':
+    main()
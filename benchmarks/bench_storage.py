@@ -0,0 +1,69 @@
+#####
+# purpose: times the report queries of the text and SQLite storage
+#          backends side by side on the same synthetic data
+# usage: python -m benchmarks.bench_storage --days 1000 --entries-per-day 20
+#####
+import argparse
+import os
+import tempfile
+import time
+
+import timely_track
+from benchmarks import synthetic
+
+#####
+# purpose: runs a function a few times and keeps the best wall time
+# inputs: function, number of repeats
+#####
+def best_time(function, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        # drain generators and cursors so the read is actually timed
+        if not isinstance(result, dict):
+            for _ in result:
+                pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--days', type=int, default=1000)
+    parser.add_argument('--entries-per-day', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        projects = synthetic.project_names(args.projects)
+        synthetic.write_projects(timely_track.PROJECTS_FILE, projects)
+        entries = synthetic.synthetic_entries(projects, args.days, args.entries_per_day)
+        count = synthetic.write_time_log(timely_track.TIME_LOG_FILE, entries)
+
+        text = timely_track.TextStorage()
+        sqlite = timely_track.SqliteStorage()
+        start = time.perf_counter()
+        sqlite.import_text_files()
+        print(f'{count} entries, SQLite import {time.perf_counter() - start:.2f} s')
+
+        last_date = max(text.daily_totals())
+        queries = (
+            ('all-time totals', lambda storage: storage.project_totals()),
+            ('daily totals', lambda storage: storage.daily_totals()),
+            ('last day entries', lambda storage: storage.iter_entries(last_date, last_date)),
+            ('all entries', lambda storage: storage.iter_entries()),
+        )
+        print(f'{"query":<18}{"text":>12}{"sqlite":>12}')
+        for name, query in queries:
+            text_time = best_time(lambda: query(text))
+            sqlite_time = best_time(lambda: query(sqlite))
+            print(f'{name:<18}{text_time * 1000:>10.1f}ms{sqlite_time * 1000:>10.1f}ms')
+
+        sqlite.connection.close()
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+
+if __name__ == '__main__':
+    main()
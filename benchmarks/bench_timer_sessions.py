@@ -0,0 +1,50 @@
+#####
+# purpose: runs hundreds of simulated concurrent timers through the
+#          asyncio session manager and reports the cost per timer for
+#          each operation, which should stay flat as the count grows
+# usage: python -m benchmarks.bench_timer_sessions --counts 100 200 400 800
+#####
+import argparse
+import asyncio
+import time
+
+import timely_track
+
+#####
+# purpose: starts, pauses, resumes and stops a number of timers
+# inputs: number of timers
+# returns: {operation: microseconds per timer}
+#####
+async def run_sessions(count):
+    logged = []
+    sessions = timely_track.TimerSessions(log=lambda project, hours: logged.append((project, hours)),
+                                          checkpoint=False)
+    names = [f'timer {i}' for i in range(count)]
+    results = {}
+
+    for operation in ('start', 'pause', 'resume', 'stop'):
+        start = time.perf_counter()
+        if operation == 'start':
+            await asyncio.gather(*(sessions.start(name, f'Client {i % 50:04d}')
+                                   for i, name in enumerate(names)))
+        else:
+            method = getattr(sessions, operation)
+            await asyncio.gather(*(method(name) for name in names))
+        results[operation] = (time.perf_counter() - start) / count * 1e6
+
+    assert len(logged) == count and not sessions.timers
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 200, 400, 800])
+    args = parser.parse_args()
+
+    print(f'{"timers":>8}' + ''.join(f'{operation:>12}' for operation in ('start', 'pause', 'resume', 'stop'))
+          + '   (microseconds per timer)')
+    for count in args.counts:
+        results = asyncio.run(run_sessions(count))
+        print(f'{count:>8}' + ''.join(f'{value:>12.1f}' for value in results.values()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#####
+# purpose: load test for timely_server, starts the server on synthetic
+#          data in another process and hits it from several client
+#          threads over kept-alive connections, reporting requests per
+#          second and p50/p99 latency per endpoint
+# usage: python -m benchmarks.load_test_server --clients 8 --requests 2000
+#####
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import timely_track
+from benchmarks import synthetic
+
+#####
+# purpose: picks a free local port for the server
+# inputs: none
+#####
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+#####
+# purpose: sends requests on one connection and records their latencies
+# inputs: port, request list [(method, path, body)], list to add seconds to
+#####
+def client(port, requests, latencies):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    for method, path, body in requests:
+        start = time.perf_counter()
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status >= 400:
+            raise RuntimeError(f'{method} {path}: HTTP {response.status}')
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+#####
+# purpose: runs one endpoint from every client thread at once
+# inputs: port, number of clients, requests per client, request
+# returns: seconds taken, sorted latencies
+#####
+def run_load(port, clients, requests, request):
+    latencies = []
+    threads = [threading.Thread(target=client, args=(port, [request] * requests, latencies))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000, help='requests per client per endpoint')
+    parser.add_argument('--days', type=int, default=1000)
+    parser.add_argument('--entries-per-day', type=int, default=20)
+    parser.add_argument('--storage', choices=sorted(timely_track.STORAGE_BACKENDS), default='text')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        projects = synthetic.project_names(50)
+        synthetic.write_projects(timely_track.PROJECTS_FILE, projects)
+        entries = synthetic.synthetic_entries(projects, args.days, args.entries_per_day)
+        count = synthetic.write_time_log(timely_track.TIME_LOG_FILE, entries)
+        os.environ['TIMELYTRACK_STORAGE'] = args.storage
+        if args.storage != 'text':
+            timely_track.get_storage().import_text_files()
+
+        port = free_port()
+        package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        environment = dict(os.environ, PYTHONPATH=package)
+        server = subprocess.Popen([sys.executable, '-m', 'timely_server', '--port', str(port)],
+                                  stdout=subprocess.PIPE, text=True, env=environment)
+        try:
+            # wait for the server to load and start listening
+            server.stdout.readline()
+
+            last_date = max(timely_track.get_storage().daily_totals())
+            month_start = last_date[:8] + '01'
+            entry = json.dumps({'date': last_date, 'project': projects[0], 'hours': 0.25, 'comment': 'load'})
+            endpoints = (
+                ('GET', '/projects', None),
+                ('GET', '/totals', None),
+                ('GET', f'/totals?since={month_start}&until={last_date}', None),
+                ('GET', f'/days?since={month_start}', None),
+                ('GET', f'/entries?since={last_date}', None),
+                ('POST', '/entries', entry),
+            )
+            print(f'{count} entries, {args.storage} storage, {args.clients} clients')
+            print(f'{"request":<48}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}')
+            for request in endpoints:
+                requests = args.requests if request[0] == 'GET' else max(args.requests // 10, 1)
+                elapsed, latencies = run_load(port, args.clients, requests, request)
+                p50 = latencies[len(latencies) // 2] * 1000
+                p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+                name = f'{request[0]} {request[1]}'
+                print(f'{name:<48}{len(latencies) / elapsed:>10,.0f}{p50:>10.2f}{p99:>10.2f}')
+        finally:
+            server.terminate()
+            server.wait()
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#####
+# purpose: stress test for writers in several processes, each process
+#          registers a project and appends entries with unique comments,
+#          then the files are checked for lost, torn or duplicated lines.
+#          Runs with and without file locking to show what locking costs.
+# usage: python -m benchmarks.stress_concurrent_writes --processes 8 --entries 500
+#####
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import timely_track
+
+#####
+# purpose: appends one worker's entries one call at a time
+# inputs: (directory, storage, locking, worker number, entries, batch size)
+#####
+def worker(args):
+    directory, storage, locking, number, entries, batch = args
+    os.chdir(directory)
+    os.environ['TIMELYTRACK_STORAGE'] = storage
+    timely_track.FILE_LOCKING = locking
+    # drop any storage handed down from the parent process
+    timely_track._storage = None
+    timely_track._registry = None
+
+    project = f'Worker {number:03d}'
+    timely_track.save_project(project)
+    records = [('2024-01-01', project, 0.25, f'w{number}-e{i}') for i in range(entries)]
+    for i in range(0, entries, batch):
+        timely_track.get_storage().append_entries(records[i:i + batch])
+
+#####
+# purpose: checks every worker's project and entries made it in exactly once
+# inputs: number of processes, entries per process
+# returns: list of problems found
+#####
+def check_files(processes, entries):
+    problems = []
+    projects = timely_track.get_storage().list_projects()
+    for number in range(processes):
+        if projects.count(f'Worker {number:03d}') != 1:
+            problems.append(f'project Worker {number:03d} saved {projects.count(f"Worker {number:03d}")} times')
+
+    seen = {}
+    count = 0
+    for date, project, hours, comment in timely_track.get_storage().iter_entries():
+        seen[comment] = seen.get(comment, 0) + 1
+        count += 1
+    if timely_track.get_storage().name == 'text':
+        with open(timely_track.TIME_LOG_FILE) as file:
+            # skip the 'Total Time Worked:' header
+            next(file)
+            torn = sum(1 for line in file if timely_track.parse_entry(line) is None)
+        if torn:
+            problems.append(f'{torn} lines do not parse')
+
+    expected = processes * entries
+    if count != expected:
+        problems.append(f'{count} entries read, {expected} written')
+    missing = sum(1 for number in range(processes) for i in range(entries)
+                  if seen.get(f'w{number}-e{i}') != 1)
+    if missing:
+        problems.append(f'{missing} entries missing or duplicated')
+    return problems
+
+#####
+# purpose: runs every worker in parallel against a fresh directory
+# inputs: parsed arguments, whether to lock
+# returns: seconds taken, list of problems found
+#####
+def run(args, locking):
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.environ['TIMELYTRACK_STORAGE'] = args.storage
+        timely_track.FILE_LOCKING = locking
+        timely_track._storage = None
+        timely_track._registry = None
+        timely_track.check_files()
+
+        jobs = [(directory, args.storage, locking, number, args.entries, args.batch)
+                for number in range(args.processes)]
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            pool.map(worker, jobs)
+        elapsed = time.perf_counter() - start
+
+        problems = check_files(args.processes, args.entries)
+
+        # leave the directory before it is removed
+        os.chdir(os.path.dirname(directory))
+    return elapsed, problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--batch', type=int, default=1)
+    parser.add_argument('--storage', choices=sorted(timely_track.STORAGE_BACKENDS), default='text')
+    args = parser.parse_args()
+
+    total = args.processes * args.entries
+    for locking in (True, False):
+        elapsed, problems = run(args, locking)
+        label = 'locked' if locking else 'unlocked'
+        print(f'{args.storage} {label}: {total} entries from {args.processes} processes in '
+              f'{elapsed:.2f} s, {total / elapsed:,.0f} entries/s')
+        for problem in problems:
+            print(f'  {problem}')
+        if not problems:
+            print('  no lost, torn or duplicated entries')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#####
+# purpose: writes deterministic projects/time log files for benchmarks
+# usage: python -m benchmarks.synthetic --projects 50 --days 365 \
+#            --entries-per-day 20 --comment-words 3 --directory data
+#####
+import argparse
+import datetime
+import os
+import random
+
+import log_parser
+
+#####
+# words used to build entry comments
+#####
+COMMENT_WORDS = ['call', 'review', 'fix', 'deploy', 'meeting', 'notes',
+                 'invoice', 'design', 'support', 'report', 'client', 'build']
+
+#####
+# purpose: builds a list of project names
+# inputs: number of projects
+#####
+def project_names(count):
+    return [f'Client {i:04d}' for i in range(count)]
+
+#####
+# purpose: generates time log entries in date order
+# inputs: project names, number of days, entries per day, words per comment,
+#         random seed and first date
+# returns: (date, project, hours, comment) per entry
+#####
+def synthetic_entries(projects, days, entries_per_day, comment_words=3, seed=0,
+                      start=datetime.date(2020, 1, 1)):
+    rng = random.Random(seed)
+    for day in range(days):
+        date = (start + datetime.timedelta(days=day)).strftime('%Y-%m-%d')
+        for _ in range(entries_per_day):
+            project = rng.choice(projects)
+            hours = round(rng.uniform(0.1, 4.0), 2)
+            comment = ' '.join(rng.choice(COMMENT_WORDS) for _ in range(comment_words))
+            yield date, project, hours, comment or None
+
+#####
+# purpose: writes a projects file
+# inputs: file path, project names
+#####
+def write_projects(path, projects):
+    with open(path, 'w') as file:
+        for project in projects:
+            file.write(project + '\n')
+
+#####
+# purpose: writes a time log file in the format log_time uses, or the
+#          older ' - ' separated format
+# inputs: file path, entries, legacy to write the older format
+# returns: number of entries written
+#####
+def write_time_log(path, entries, legacy=False):
+    format_line = log_parser.format_legacy_entry if legacy else log_parser.format_entry
+    count = 0
+    with open(path, 'w') as file:
+        file.write('Total Time Worked:\n')
+        for entry in entries:
+            file.write(format_line(*entry))
+            count += 1
+    return count
+
+#####
+# purpose: first date for a log of a number of days that ends today, so
+#          today's reports have entries
+# inputs: number of days
+#####
+def start_for_today(days):
+    return datetime.date.today() - datetime.timedelta(days=days - 1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic projects.txt and time_log.txt.')
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--entries-per-day', type=int, default=20)
+    parser.add_argument('--comment-words', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--legacy', action='store_true', help="write the older ' - ' separated format")
+    parser.add_argument('--directory', default='.')
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    projects = project_names(args.projects)
+    write_projects(os.path.join(args.directory, 'projects.txt'), projects)
+    entries = synthetic_entries(projects, args.days, args.entries_per_day, args.comment_words,
+                                args.seed, start_for_today(args.days))
+    count = write_time_log(os.path.join(args.directory, 'time_log.txt'), entries, args.legacy)
+    print(f'{len(projects)} projects and {count} entries written to {args.directory}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#####
+# purpose: reads and writes time log lines for every module that touches
+#          time_log.txt or its shards.
+#
+# New lines are tab separated: date, project, hours, comment. Backslash,
+# tab, newline and carriage return in a project or comment are escaped, so
+# names and comments may hold ': ' or ' - ' freely. Older lines written as
+# '{date} - {project}: {hours} hours - {comment}' are still read.
+#####
+import re
+
+#####
+# characters escaped inside a field and their escapes
+#####
+ESCAPES = {'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'}
+ESCAPE_TABLE = str.maketrans(ESCAPES)
+UNESCAPES = {escape[1]: char for char, escape in ESCAPES.items()}
+UNESCAPE_PATTERN = re.compile(r'\\(.)')
+SPECIAL_PATTERN = re.compile(r'[\\\t\n\r]')
+
+#####
+# purpose: escapes a field for the tab separated format
+# inputs: field text
+#####
+def escape_field(text):
+    if SPECIAL_PATTERN.search(text) is None:
+        return text
+    return text.translate(ESCAPE_TABLE)
+
+#####
+# purpose: undoes escape_field, unknown escapes keep the escaped character
+# inputs: field text
+#####
+def unescape_field(text):
+    if '\\' not in text:
+        return text
+    return UNESCAPE_PATTERN.sub(lambda match: UNESCAPES.get(match.group(1), match.group(1)), text)
+
+#####
+# purpose: formats an entry as a time log line
+# inputs: date, project, hours and optional comment
+#####
+def format_entry(date, project, hours, comment=None):
+    return f'{date}\t{escape_field(project)}\t{hours}\t{escape_field(comment or "")}\n'
+
+#####
+# purpose: formats an entry the way older versions wrote it, still used
+#          to show entries on screen
+# inputs: date, project, hours and optional comment
+#####
+def format_legacy_entry(date, project, hours, comment=None):
+    entry = f'{date} - {project}: {hours} hours'
+    if comment:
+        entry += f' - {comment}'
+    return entry + '\n'
+
+#####
+# purpose: splits a time log line into its parts, either format. Older
+#          lines could hold a tab in the comment, so a line that does not
+#          split into four tab separated fields is read as an older one.
+# inputs: raw line from the time log, with or without its newline
+# returns: (date, project, hours, comment) or None if the line is not an entry
+#####
+def parse_entry(line):
+    if '\t' not in line:
+        return parse_legacy_entry(line)
+
+    fields = line.rstrip('\r\n').split('\t')
+    if len(fields) != 4 or not fields[0]:
+        return parse_legacy_entry(line)
+    date, project, hours, comment = fields
+    try:
+        hours = float(hours)
+    except ValueError:
+        return parse_legacy_entry(line)
+    # most fields hold nothing to unescape, skip the call for them
+    if '\\' in project:
+        project = unescape_field(project)
+    if '\\' in comment:
+        comment = unescape_field(comment)
+    return date, project, hours, comment or None
+
+#####
+# purpose: splits an older ' - ' separated line into its parts
+# inputs: raw line from the time log
+# returns: (date, project, hours, comment) or None if the line is not an entry
+#####
+def parse_legacy_entry(line):
+    parts = line.strip().split(' - ', 1)
+    if len(parts) != 2 or not parts[0]:
+        return None
+    timestamp, entry_data = parts
+    date = timestamp.split()[0]
+
+    # project name ends at the first ': ', hours end at the first ' - '
+    project, sep, rest = entry_data.partition(': ')
+    if not sep:
+        return None
+    hours_text, _, comment = rest.partition(' - ')
+    try:
+        hours = float(hours_text.split()[0])
+    except (ValueError, IndexError):
+        return None
+
+    return date, project, hours, comment.strip() or None
@@ -0,0 +1,357 @@
+#####
+# purpose: opt-in instrumentation for finding where a slow report spends
+#          its time. Turned on with TIMELYTRACK_TRACE=trace.jsonl or the
+#          --trace option, it wraps the reports, the commands and the
+#          writes behind log_time/save_project/delete_project, and times
+#          the read, parse, aggregate, render, write and input phases
+#          inside each of them. Every command adds one JSON line to the
+#          trace file. TIMELYTRACK_PROFILE=folder (or --profile) also saves
+#          a cProfile dump per command for pstats or snakeviz.
+#
+#          Nothing here is imported, and nothing is wrapped, unless one of
+#          them is set, so the functions run unchanged otherwise.
+#
+# trace line: {"time", "pid", "command", "storage", "seconds",
+#              "phases": {phase: {"seconds", "calls", and where known
+#                                 "bytes", "lines", "entries", "rows", "chars"}},
+#              "profile" and "error" when there is one}
+#####
+import builtins
+import cProfile
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+#####
+# module functions that start a trace line, besides every display_*
+# function and the command line commands
+#####
+COMMANDS = ('log_time', 'log_entries', 'save_project', 'delete_project', 'delete_projects', 'import_csv')
+
+#####
+# module functions timed as a phase of whatever command calls them
+#####
+PHASE_FUNCTIONS = {
+    'parse_entry': 'parse',
+    'aggregate_time_log': 'aggregate',
+    'refresh_time_log_cache': 'aggregate',
+    'get_range_totals': 'aggregate',
+    'clear_screen': 'render',
+    'render_log_page': 'render',
+    'render_dashboard': 'render',
+    'append_lines': 'write',
+    'write_atomic': 'write',
+}
+
+#####
+# storage backend methods timed as a phase
+#####
+STORAGE_PHASES = {
+    'iter_entries': 'read',
+    'project_totals': 'aggregate',
+    'daily_totals': 'aggregate',
+    'append_entries': 'write',
+    'save_project': 'write',
+    'delete_projects': 'write',
+    'compact_projects': 'write',
+}
+
+#####
+# purpose: per-thread phase timings of the command running in it. Time is
+#          charged to the innermost phase only, so a read that parses as
+#          it goes splits into read and parse time, and time in the
+#          command outside any phase is 'other'.
+#####
+class Tracer(threading.local):
+    def __init__(self):
+        self.phases = None
+        self.stack = []
+        self.started = 0.0
+
+    def stats(self, phase):
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = {'seconds': 0.0, 'calls': 0}
+        return stats
+
+    def begin(self):
+        self.phases = {}
+        self.started = time.perf_counter()
+        self.stack = [['other', self.started]]
+        self.stats('other')['calls'] += 1
+
+    # charges the time since the innermost phase last started to it
+    def _charge(self, now):
+        phase, started = self.stack[-1]
+        self.phases[phase]['seconds'] += now - started
+
+    def enter(self, phase, call=True):
+        now = time.perf_counter()
+        self._charge(now)
+        stats = self.stats(phase)
+        if call:
+            stats['calls'] += 1
+        self.stack.append([phase, now])
+
+    def exit(self):
+        now = time.perf_counter()
+        self._charge(now)
+        self.stack.pop()
+        self.stack[-1][1] = now
+
+    def count(self, phase, key, amount):
+        stats = self.stats(phase)
+        stats[key] = stats.get(key, 0) + amount
+
+    def finish(self):
+        now = time.perf_counter()
+        self._charge(now)
+        phases = self.phases
+        self.phases = None
+        self.stack = []
+        return now - self.started, phases
+
+tracer = Tracer()
+
+#####
+# purpose: wraps a function as a phase, counting from its arguments and
+#          result with counter(args, kwargs, result) if given
+# inputs: phase name, function, optional counter
+#####
+def phase_wrapper(phase, function, counter=None):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if tracer.phases is None:
+            return function(*args, **kwargs)
+        tracer.enter(phase)
+        try:
+            result = function(*args, **kwargs)
+            if counter is not None:
+                counter(args, kwargs, result)
+            return result
+        finally:
+            tracer.exit()
+    return wrapper
+
+#####
+# purpose: times each step of an iterator as a phase, so only the time
+#          spent producing items is charged to it
+# inputs: phase name, iterator, optional count(item) called per item
+#####
+def traced_iterator(phase, iterator, count=None):
+    while True:
+        if tracer.phases is None:
+            # the command finished before the iterator did
+            yield from iterator
+            return
+        tracer.enter(phase, call=False)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            tracer.exit()
+        if count is not None:
+            count(item)
+        yield item
+
+#####
+# purpose: wraps a function returning an iterable as a phase, timing the
+#          call and each item taken from the result
+# inputs: phase name, function, optional count(item) factory taking the
+#         call's (args, kwargs)
+#####
+def iterator_wrapper(phase, function, counter=None):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if tracer.phases is None:
+            return function(*args, **kwargs)
+        tracer.enter(phase)
+        try:
+            iterator = iter(function(*args, **kwargs))
+        finally:
+            tracer.exit()
+        count = counter(args, kwargs) if counter is not None else None
+        return traced_iterator(phase, iterator, count)
+    return wrapper
+
+#####
+# counters for the phases that know their bytes, lines or entries
+#####
+def count_log_lines(args, kwargs):
+    # read_log_lines yields the offset after each line, so the bytes read
+    # are the distance from the starting offset
+    last = [kwargs.get('offset', args[0] if args else 0)]
+
+    def count(item):
+        tracer.count('read', 'bytes', item[0] - last[0])
+        tracer.count('read', 'lines', 1)
+        last[0] = item[0]
+    return count
+
+def count_entries(args, kwargs):
+    return lambda item: tracer.count('read', 'entries', 1)
+
+def count_parsed(args, kwargs, entry):
+    if entry is not None:
+        tracer.count('parse', 'entries', 1)
+
+def count_rows(args, kwargs, result):
+    tracer.count('aggregate', 'rows', len(result))
+
+def count_appended_bytes(args, kwargs, result):
+    lines = kwargs.get('lines', args[1] if len(args) > 1 else ())
+    tracer.count('write', 'bytes', sum(len(line.encode()) for line in lines))
+
+def count_written_bytes(args, kwargs, result):
+    text = kwargs.get('text', args[1] if len(args) > 1 else '')
+    tracer.count('write', 'bytes', len(text.encode()))
+
+#####
+# purpose: lists the lines and entries before an append so they can be
+#          counted after it
+#####
+def listing_arguments(function, position, name):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if tracer.phases is not None:
+            if name in kwargs:
+                kwargs[name] = list(kwargs[name])
+            elif len(args) > position:
+                args = args[:position] + (list(args[position]),) + args[position + 1:]
+        return function(*args, **kwargs)
+    return wrapper
+
+def count_appended_entries(args, kwargs, result):
+    entries = kwargs.get('entries', args[1] if len(args) > 1 else ())
+    tracer.count('write', 'entries', len(entries))
+
+#####
+# purpose: writes one command's trace line, and its profile if asked for
+#####
+class TraceLog:
+    def __init__(self, path, profile_dir=None):
+        self.path = path
+        self.profile_dir = profile_dir
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self.lock, open(self.path, 'a') as file:
+            file.write(line)
+
+    def profile_path(self, command):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        return os.path.join(self.profile_dir, f'{command}-{stamp}-{os.getpid()}.prof')
+
+#####
+# purpose: wraps a command so it writes a trace line when it returns.
+#          Commands called from inside another one, like log_entries
+#          from the stop command, are part of the outer command's line.
+# inputs: module, trace log, command name, function
+#####
+def command_wrapper(module, trace_log, name, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if tracer.phases is not None:
+            return function(*args, **kwargs)
+
+        profile = None
+        if trace_log.profile_dir:
+            profile = cProfile.Profile()
+        error = None
+        tracer.begin()
+        if profile is not None:
+            profile.enable()
+        try:
+            return function(*args, **kwargs)
+        except BaseException as exception:
+            error = repr(exception)
+            raise
+        finally:
+            if profile is not None:
+                profile.disable()
+            seconds, phases = tracer.finish()
+            storage = module._storage
+            record = {'time': datetime.datetime.now().isoformat(timespec='milliseconds'),
+                      'pid': os.getpid(), 'command': name,
+                      'storage': storage.name if storage is not None else None,
+                      'seconds': round(seconds, 6),
+                      'phases': {phase: dict(stats, seconds=round(stats['seconds'], 6))
+                                 for phase, stats in phases.items()}}
+            if profile is not None:
+                record['profile'] = trace_log.profile_path(name)
+                profile.dump_stats(record['profile'])
+            if error is not None:
+                record['error'] = error
+            trace_log.write(record)
+    return wrapper
+
+#####
+# purpose: asks for input through whatever builtins.input is at the time,
+#          so waiting on the user is its own phase
+#####
+def ask(*args):
+    return builtins.input(*args)
+
+#####
+# purpose: wraps the module's reports, commands, writes and phases
+# inputs: timely_track module (__main__ when run as a script), trace file
+#         path, optional folder for cProfile dumps
+#####
+def instrument(module, trace_path, profile_dir=None):
+    if getattr(module, '_instrumented', False):
+        return
+    module._instrumented = True
+    trace_log = TraceLog(trace_path, profile_dir)
+
+    # phases first, commands look them up as module globals when they run
+    module.read_log_lines = iterator_wrapper('read', module.read_log_lines, count_log_lines)
+    for name, phase in PHASE_FUNCTIONS.items():
+        counter = {'parse_entry': count_parsed,
+                   'append_lines': count_appended_bytes,
+                   'write_atomic': count_written_bytes}.get(name)
+        function = phase_wrapper(phase, getattr(module, name), counter)
+        if name == 'append_lines':
+            function = listing_arguments(function, 1, 'lines')
+        setattr(module, name, function)
+    module.input = phase_wrapper('input', ask)
+
+    flush = phase_wrapper('render', module.ReportBuffer.flush)
+
+    @functools.wraps(flush)
+    def counted_flush(self):
+        if tracer.phases is not None and self.size:
+            # counted before the flush empties the buffer
+            tracer.count('render', 'chars', self.size)
+        return flush(self)
+    module.ReportBuffer.flush = counted_flush
+    module.RangeTotals.totals = phase_wrapper('aggregate', module.RangeTotals.totals, count_rows)
+
+    for storage_class in module.STORAGE_BACKENDS.values():
+        for name, phase in STORAGE_PHASES.items():
+            # only methods the class defines, inherited ones are already wrapped
+            method = storage_class.__dict__.get(name)
+            if method is None:
+                continue
+            if name == 'iter_entries':
+                method = iterator_wrapper(phase, method, count_entries)
+            elif name == 'append_entries':
+                method = listing_arguments(phase_wrapper(phase, method, count_appended_entries), 1, 'entries')
+            elif phase == 'aggregate':
+                method = phase_wrapper(phase, method, count_rows)
+            else:
+                method = phase_wrapper(phase, method)
+            setattr(storage_class, name, method)
+
+    names = [name for name in dir(module) if name.startswith('display_')] + list(COMMANDS)
+    for name in names:
+        setattr(module, name, command_wrapper(module, trace_log, name, getattr(module, name)))
+    for name, function in list(module.CLI_COMMANDS.items()):
+        wrapped = command_wrapper(module, trace_log, f'cli_{name}', function)
+        module.CLI_COMMANDS[name] = wrapped
+        setattr(module, function.__name__, wrapped)
@@ -0,0 +1,185 @@
+#####
+# purpose: optional local HTTP server giving other tools JSON access to
+#          projects, entries and totals without parsing the time log.
+#          Totals are kept in memory and follow new entries the same way
+#          the live dashboard does.
+# usage: python -m timely_server --port 8765
+#
+# GET  /projects                          {"projects": [...]}
+# GET  /entries?since=YYYY-MM-DD&until=   {"entries": [{date, project, hours, comment}]}
+# GET  /totals?since=&until=              {"totals": {project: hours}, "total": hours}
+# GET  /days?since=&until=                {"days": {date: {project: hours}}}
+# POST /entries                           one entry object or a list of them,
+#                                         date defaults to today
+#####
+import argparse
+import datetime
+import http.server
+import json
+import threading
+import urllib.parse
+
+import timely_track
+
+#####
+# purpose: in-memory aggregates behind the reports, checked for new
+#          entries before each request. Requests run on their own threads,
+#          every storage call is made under the lock so they take turns
+#          with the storage (and the SQLite connection).
+#####
+class Aggregates:
+    def __init__(self):
+        self.lock = threading.Lock()
+        storage = timely_track.get_storage()
+        if storage.name == 'text':
+            self.follower = timely_track.LogFollower()
+        else:
+            self.follower = timely_track.StorageFollower(storage)
+
+    def projects(self):
+        with self.lock:
+            return timely_track.list_projects()
+
+    def entries(self, since, until):
+        with self.lock:
+            self.follower.poll()
+            return [{'date': date, 'project': project, 'hours': hours, 'comment': comment}
+                    for date, project, hours, comment in self.follower.iter_entries(since, until)]
+
+    def totals(self, since, until):
+        with self.lock:
+            self.follower.poll()
+            if since is None and until is None:
+                return dict(self.follower.totals())
+            return timely_track.get_range_totals().totals(since, until)
+
+    def days(self, since, until):
+        with self.lock:
+            self.follower.poll()
+            # copies, the follower updates its dicts in place
+            return {date: dict(daily_totals)
+                    for date, daily_totals in self.follower.daily_totals(since, until).items()}
+
+    #####
+    # purpose: logs POSTed entries through the same checks and append
+    #          path as the menus and command line
+    # inputs: decoded JSON, one entry object or a list of them
+    # returns: number of entries logged
+    #####
+    def log(self, body):
+        records = body if isinstance(body, list) else [body]
+        today = datetime.date.today().strftime('%Y-%m-%d')
+        entries = []
+        for record in records:
+            if not isinstance(record, dict):
+                raise ValueError('entries must be JSON objects')
+            date = record.get('date') or today
+            project = record.get('project')
+            hours = record.get('hours')
+            comment = record.get('comment')
+            if not isinstance(date, str) or not isinstance(project, str):
+                raise ValueError('date and project must be strings')
+            if comment is not None and not isinstance(comment, str):
+                raise ValueError('comment must be a string')
+            # bool is an int to isinstance but not hours
+            if isinstance(hours, bool) or not isinstance(hours, (int, float)):
+                raise ValueError('hours must be a number')
+            entries.append((date, project, hours, comment))
+        with self.lock:
+            return timely_track.log_entries(entries)
+
+#####
+# purpose: checks an optional date query parameter
+# inputs: parsed query string, parameter name
+# returns: YYYY-MM-DD or None
+#####
+def date_parameter(query, name):
+    values = query.get(name)
+    if not values:
+        return None
+    return timely_track.parse_date(values[0])
+
+#####
+# purpose: answers API requests, keeping connections open between them
+#####
+class RequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are separate writes, without this Nagle's algorithm
+    # holds the body back for the client's delayed ACK
+    disable_nagle_algorithm = True
+    aggregates = None
+    verbose = False
+
+    def send_json(self, status, data):
+        body = json.dumps(data, separators=(',', ':')).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            since = date_parameter(query, 'since')
+            until = date_parameter(query, 'until')
+        except ValueError:
+            self.send_json(400, {'error': 'dates look like 2024-01-31'})
+            return
+
+        if url.path == '/projects':
+            self.send_json(200, {'projects': self.aggregates.projects()})
+        elif url.path == '/entries':
+            self.send_json(200, {'entries': self.aggregates.entries(since, until)})
+        elif url.path == '/totals':
+            totals = self.aggregates.totals(since, until)
+            self.send_json(200, {'totals': totals, 'total': round(sum(totals.values()), 2)})
+        elif url.path == '/days':
+            self.send_json(200, {'days': self.aggregates.days(since, until)})
+        else:
+            self.send_json(404, {'error': f'no such endpoint: {url.path}'})
+
+    def do_POST(self):
+        if urllib.parse.urlsplit(self.path).path != '/entries':
+            self.send_json(404, {'error': f'no such endpoint: {self.path}'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            count = self.aggregates.log(json.loads(self.rfile.read(length) or b'null'))
+        except ValueError as error:
+            self.send_json(400, {'error': str(error)})
+            return
+        self.send_json(201, {'logged': count})
+
+    # request lines only go to stderr with --verbose
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+#####
+# purpose: serves the API until interrupted
+# inputs: address and port to listen on, verbose to log each request
+#####
+def serve(host='127.0.0.1', port=8765, verbose=False):
+    timely_track.check_files(interactive=False)
+    RequestHandler.aggregates = Aggregates()
+    RequestHandler.verbose = verbose
+    with http.server.ThreadingHTTPServer((host, port), RequestHandler) as server:
+        print(f'Serving on http://{host}:{server.server_port}', flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve TimelyTrack totals as JSON.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    timely_track.instrument()
+    serve(args.host, args.port, args.verbose)
+
+if __name__ == '__main__':
+    main()
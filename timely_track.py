@@ -13,64 +13,269 @@
 # import os to use the operating system for the filepath
 # import datetime to timestamp entries
 # import time for track time worked
+# import json to store the report cache
+# import locale to decode the time log like text mode does
+# import struct to pack columnar entry records
+# import contextlib/sys for the timer's keyboard handling, msvcrt on
+# Windows and selectors/termios everywhere else, fcntl/msvcrt also lock
+# files between processes
+# import bisect/itertools to search and page the project picker
+# import math to reject hours that are not finite numbers
+# import log_parser to read and write time log lines
+# asyncio (timer sessions), concurrent.futures (parallel shard totals),
+# argparse (command line), shutil (time log pages) and csv are imported
+# where they are used so the command line starts quickly
 #####
 import os
+import sys
 import datetime
 import time
-import msvcrt
+import json
+import locale
+import struct
+import contextlib
+import bisect
+import itertools
+import math
+
+from log_parser import parse_entry, format_entry, format_legacy_entry
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+    import selectors
+    try:
+        import termios
+    except ImportError:
+        termios = None
+
+#####
+# files used to store projects, time entries, cached report totals,
+# running timers and recently used projects,
+# and the files used by the SQLite, columnar and sharded storage backends
+#####
+PROJECTS_FILE = 'projects.txt'
+TIME_LOG_FILE = 'time_log.txt'
+TIME_LOG_CACHE_FILE = 'time_log.cache'
+TIME_LOG_CACHE_DAYS_FILE = 'time_log.cache.days'
+TIMER_CHECKPOINT_FILE = 'timers.checkpoint'
+RECENT_PROJECTS_FILE = 'recent_projects.txt'
+SQLITE_FILE = 'timely_track.db'
+COLUMNAR_FILE = 'time_log.bin'
+COLUMNAR_HEAP_FILE = 'time_log.heap'
+COLUMNAR_NAMES_FILE = 'time_log.names'
+SHARD_DIR = 'time_log.shards'
+SHARD_MANIFEST_FILE = os.path.join(SHARD_DIR, 'manifest.json')
+SHARD_ROLLUP_FILE = os.path.join(SHARD_DIR, 'rollups.json')
+
+#####
+# advisory locks keep writers in several processes, possibly on several
+# machines sharing the files, from losing each other's writes. Each file
+# is locked through a separate '.lock' file so an atomic replace of the
+# file itself is still covered. Only turned off to measure its cost.
+#####
+FILE_LOCKING = True
+
+if os.name == 'nt':
+    def lock_fd(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after 10 seconds, keep waiting
+                continue
+
+    def unlock_fd(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    # lockf rather than flock so the lock also holds on NFS volumes
+    def lock_fd(fd):
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+
+    def unlock_fd(fd):
+        fcntl.lockf(fd, fcntl.LOCK_UN)
+
+#####
+# purpose: holds an exclusive lock on a file while writing it
+# inputs: path of the file being written
+#####
+@contextlib.contextmanager
+def file_lock(path):
+    if not FILE_LOCKING:
+        yield
+        return
+
+    fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        lock_fd(fd)
+        try:
+            yield
+        finally:
+            unlock_fd(fd)
+    finally:
+        os.close(fd)
+
+#####
+# purpose: writes all of a buffer to a file descriptor
+# inputs: file descriptor, bytes
+#####
+def write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+#####
+# purpose: appends whole lines to a file under its lock with O_APPEND
+#          writes, so lines from different processes never interleave
+# inputs: file path, lines ending in a newline
+#####
+def append_lines(path, lines):
+    encoding = locale.getpreferredencoding(False)
+    with file_lock(path):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            # batch whole lines into large writes
+            chunk = []
+            size = 0
+            for line in lines:
+                data = line.encode(encoding)
+                chunk.append(data)
+                size += len(data)
+                if size >= READ_CHUNK_SIZE:
+                    write_all(fd, b''.join(chunk))
+                    chunk = []
+                    size = 0
+            if chunk:
+                write_all(fd, b''.join(chunk))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+#####
+# purpose: identifies a version of a file for caches built from it
+# inputs: file path
+# returns: (mtime_ns, size, inode), or None if the file does not exist
+#####
+def file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+#####
+# purpose: replaces a file's contents atomically with a temp file and rename
+# inputs: file path, new text, whether to fsync before the rename
+#####
+def write_atomic(path, text, fsync=False):
+    # the temp file is per process so concurrent writers do not collide
+    temp_file = f'{path}.{os.getpid()}.tmp'
+    with open(temp_file, 'w') as file:
+        file.write(text)
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+    os.replace(temp_file, path)
+
 #####
 # purpose: to check if files exist
-# inputs: none
+# inputs: interactive to offer importing time_log.txt into a new backend
 #####
-def check_files():
-    if not os.path.exists('projects.txt'):
+def check_files(interactive=True):
+    if not os.path.exists(PROJECTS_FILE):
         # create an empty projects file
-        with open('projects.txt', 'w') as file:
+        with open(PROJECTS_FILE, 'w') as file:
             pass
 
-    if not os.path.exists('time_log.txt'):
+    if not os.path.exists(TIME_LOG_FILE):
         # create a time log file with initial line
-        with open('time_log.txt', 'w') as file:
+        with open(TIME_LOG_FILE, 'w') as file:
             file.write('Total Time Worked:\n')
 
+    # offer to migrate the text files the first time another backend is used
+    storage = get_storage()
+    if interactive and hasattr(storage, 'import_text_files') and storage.is_empty() \
+            and next(TextStorage().iter_entries(), None) is not None:
+        choice = input(f'Import existing time_log.txt into the {storage.name} storage? (y/n)\n~>').lower()
+        if choice == 'y':
+            count = storage.import_text_files()
+            print(f'{count} entries imported.')
+
 #####
 # function: save_project
-# purpose: saves projects to a file
+# purpose: saves projects to the selected storage
 # inputs: project name to be saved
 #####
 def save_project(name):
-    with open('projects.txt', 'a') as file:
-        file.write(name + '\n')
+    get_registry().add(name)
 
 #####
 # purpose: to clear the screen when switching menus
 #####
 def clear_screen():
-    os.system(('cls' if os.name == 'nt' else 'clear'))
+    if not sys.stdout.isatty():
+        # nothing to clear when the output is piped or redirected
+        return
+    if enable_escape_sequences():
+        sys.stdout.write(CLEAR_SCREEN_SEQUENCE)
+        sys.stdout.flush()
+    else:
+        # older Windows consoles without escape sequence support
+        os.system('cls')
+
+#####
+# clears the screen and scrollback and moves the cursor home, the same
+# as the clear command but without starting a process
+#####
+CLEAR_SCREEN_SEQUENCE = '\033[2J\033[3J\033[H'
+_escape_sequences = None
+
+#####
+# purpose: checks the terminal handles escape sequences, turning them on
+#          in the Windows console where they are off by default
+# inputs: none
+# returns: True if escape sequences can be written
+#####
+def enable_escape_sequences():
+    global _escape_sequences
+    if _escape_sequences is None:
+        _escape_sequences = True
+        if os.name == 'nt':
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            STD_OUTPUT_HANDLE = -11
+            ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+            handle = kernel32.GetStdHandle(STD_OUTPUT_HANDLE)
+            mode = ctypes.c_uint32()
+            _escape_sequences = bool(kernel32.GetConsoleMode(handle, ctypes.byref(mode))
+                                     and kernel32.SetConsoleMode(handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+    return _escape_sequences
 
 #####
-# purpose: deletes projects from file
+# purpose: deletes projects from the selected storage
 # inputs: project name to be deleted
 #####
 def delete_project(name):
-    with open('projects.txt', 'r') as file:
-        lines = file.readlines()
+    get_registry().remove([name])
 
-    with open('projects.txt', 'w') as file:
-        # write lines except one to be deleted
-        for line in lines:
-            if line.strip() != name:
-                file.write(line)
+#####
+# purpose: deletes several projects from the selected storage in one pass
+# inputs: project names to be deleted
+#####
+def delete_projects(names):
+    get_registry().remove(names)
 
 #####
 # purpose: to list projects in terminal
 # inputs: none
 #####
 def list_projects():
-    with open('projects.txt', 'r') as file:
-        projects = file.readlines()
-    # return list of project names w/o newline chars
-    return [project.strip() for project in projects]
+    return get_registry().list()
 
 #####
 # purpose: logs user time inputs and applies timestamps
@@ -80,23 +285,598 @@ def log_time(project, hours, date=None):
     if date is None:
         # Get current date if date parameter is not provided
         date = datetime.date.today().strftime('%Y-%m-%d')
-    # Get timestamp
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    # Create entry with timestamp and project name
-    entry = f'{date} - {project}: {hours} hours'
 
     # Ask the user if they want to add a comment
+    comment = None
     comment_choice = input('\nDo you want to add a comment? (y/n)\n~>').lower()
 
     if comment_choice == 'y':
         comment = input('Enter your comment\n~>')
-        entry += f' - {comment}'
 
-    entry += '\n'
+    # Write the entry to the selected storage
+    get_storage().append_entry(date, project, hours, comment)
+
+#####
+# purpose: checks a date and writes it the way the time log does
+# inputs: date text, e.g. 2024-01-31 or 2024-1-31
+# returns: YYYY-MM-DD
+#####
+def parse_date(text):
+    return datetime.datetime.strptime(text, '%Y-%m-%d').date().isoformat()
+
+#####
+# purpose: checks hours, 'nan' and 'inf' pass float() but break the totals
+# inputs: hours as a number or text
+# returns: hours rounded to 2 decimal places
+#####
+def parse_hours(value):
+    hours = float(value)
+    if not math.isfinite(hours):
+        raise ValueError(f'hours must be a number, not {value!r}')
+    return round(hours, 2)
+
+#####
+# purpose: logs many entries without prompting, checking them against the
+#          project list and writing them to storage in one buffered write
+# inputs: iterable of (date, project, hours, comment) records
+# returns: number of entries logged
+#####
+def log_entries(records):
+    registry = get_registry()
+    # dates as given to the same date written zero padded, which is how
+    # every date range compares them
+    valid_dates = {}
+    entries = []
+
+    for number, record in enumerate(records, start=1):
+        try:
+            date, project, hours, comment = record
+            if date not in valid_dates:
+                valid_dates[date] = parse_date(date)
+            date = valid_dates[date]
+            hours = parse_hours(hours)
+        except (TypeError, ValueError) as error:
+            raise ValueError(f'Entry {number}: {error}') from None
+
+        if project not in registry:
+            raise ValueError(f'Entry {number}: unknown project {project!r}')
+        if hours < 0:
+            raise ValueError(f'Entry {number}: hours cannot be negative')
+        if comment:
+            # a comment cannot span lines in the time log
+            comment = ' '.join(comment.splitlines())
+        entries.append((date, project, hours, comment or None))
+
+    get_storage().append_entries(entries)
+    return len(entries)
+
+#####
+# purpose: imports entries from a CSV file with date, project, hours and
+#          an optional comment column
+# inputs: CSV file path
+# returns: number of entries logged
+#####
+def import_csv(path):
+    import csv
+
+    # spreadsheet exports are usually UTF-8 and often start with a BOM
+    with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+        reader = csv.DictReader(file)
+        if reader.fieldnames is None:
+            return 0
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        return log_entries(tuple(value.strip() if isinstance(value, str) else value
+                                 for value in (row.get('date'), row.get('project'),
+                                               row.get('hours'), row.get('comment')))
+                           for row in reader)
+
+#####
+# purpose: asks for a CSV file and imports it
+# inputs: file path
+#####
+def import_csv_menu():
+    path = input('Enter the path of a CSV file with date, project, hours and comment columns\n~>')
+    try:
+        count = import_csv(path.strip())
+        print(f'{count} entries imported.')
+    except (OSError, ValueError) as error:
+        print(f'Import failed: {error}')
+    input('Press Enter to continue...')
+
+#####
+# how often Windows checks the keyboard while a timer runs, msvcrt has
+# no way to block until a key is pressed
+#####
+KEY_POLL_INTERVAL = 0.1
+
+#####
+# purpose: waits until Enter is pressed or the timeout passes
+# inputs: seconds to wait at most, optional file descriptor that ends
+#         the wait early when it becomes readable (not on Windows)
+# returns: True if Enter was pressed
+#####
+if os.name == 'nt':
+    def wait_for_enter(timeout, wake_fd=None):
+        deadline = time.monotonic() + timeout
+        while True:
+            while msvcrt.kbhit():
+                if msvcrt.getch() == b'\r':
+                    return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, KEY_POLL_INTERVAL))
+else:
+    def wait_for_enter(timeout, wake_fd=None):
+        # stdin only becomes readable once a whole line has been typed, so
+        # this sleeps in the kernel until Enter or the timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(sys.stdin, selectors.EVENT_READ)
+            if wake_fd is not None:
+                selector.register(wake_fd, selectors.EVENT_READ)
+            for key, events in selector.select(max(timeout, 0)):
+                if key.fileobj is sys.stdin:
+                    sys.stdin.readline()
+                    return True
+        return False
+
+#####
+# purpose: stops the terminal echoing keys while the timer line is drawn
+# inputs: none
+#####
+@contextlib.contextmanager
+def timer_keyboard():
+    if os.name == 'nt' or termios is None or not sys.stdin.isatty():
+        # msvcrt.getch does not echo
+        yield
+        return
+
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    quiet = termios.tcgetattr(fd)
+    quiet[3] &= ~termios.ECHO
+    termios.tcsetattr(fd, termios.TCSADRAIN, quiet)
+    try:
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+#####
+# purpose: seconds until the elapsed hours shown (rounded to 2 places)
+#          next change
+# inputs: elapsed seconds
+#####
+def seconds_to_next_display(elapsed):
+    # 0.01 hours is 36 seconds and the rounding flips half way through
+    return 36 - (elapsed + 18) % 36 + 0.01
+
+#####
+# purpose: tracks elapsed time for one project, can be paused and resumed
+# inputs: project name, clock returning seconds (monotonic by default so
+#         clock changes do not affect the result)
+#####
+class Timer:
+    def __init__(self, project, clock=time.monotonic):
+        self.project = project
+        self.clock = clock
+        self.start_time = clock()
+        self.paused_seconds = 0.0
+        self.paused_at = None
+
+    @property
+    def paused(self):
+        return self.paused_at is not None
+
+    def pause(self):
+        if self.paused_at is None:
+            self.paused_at = self.clock()
+
+    def resume(self):
+        if self.paused_at is not None:
+            self.paused_seconds += self.clock() - self.paused_at
+            self.paused_at = None
+
+    # seconds the timer has been running, not counting pauses
+    def elapsed(self):
+        now = self.paused_at if self.paused_at is not None else self.clock()
+        return now - self.start_time - self.paused_seconds
+
+    # elapsed hours rounded to 2 decimal places
+    def hours(self):
+        return round(self.elapsed() / 3600, 2)
+
+    # checkpoint record with wall clock times, the monotonic clock does
+    # not carry over to another process
+    def to_record(self, name=None):
+        now = time.time()
+        offset = now - self.clock()
+        return {
+            'name': name,
+            'project': self.project,
+            'start': self.start_time + offset,
+            'paused_seconds': self.paused_seconds,
+            'paused_at': self.paused_at + offset if self.paused_at is not None else None,
+            'updated': now,
+            'owner': None,
+        }
+
+    @classmethod
+    def from_record(cls, record, clock=time.monotonic):
+        timer = cls(record['project'], clock)
+        offset = time.time() - clock()
+        timer.start_time = record['start'] - offset
+        timer.paused_seconds = record['paused_seconds']
+        if record['paused_at'] is not None:
+            timer.paused_at = record['paused_at'] - offset
+        return timer
+
+#####
+# running timers are checkpointed at this cadence in seconds, and when
+# they are started, paused, resumed or stopped. A timer owned by a
+# process on another computer is only taken as abandoned once its
+# checkpoint is this many intervals old.
+#####
+CHECKPOINT_INTERVAL = 60
+CHECKPOINT_STALE_INTERVALS = 3
+
+#####
+# owner of timers started from the command line, no process runs them so
+# they are never taken as abandoned and are only stopped from there
+#####
+CLI_TIMER_OWNER = 'cli'
+
+#####
+# purpose: names this process in the checkpoint records it owns
+# inputs: none
+# returns: 'host:pid'
+#####
+def checkpoint_owner():
+    import socket
+
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+#####
+# purpose: checks whether a process on this computer is still running
+# inputs: process ID
+# returns: True or False, or None where it cannot be checked
+#####
+def process_alive(pid):
+    if os.name == 'nt':
+        # os.kill would end the process on Windows
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # running as another user
+        return True
+    return True
+
+#####
+# purpose: checks whether a checkpointed timer was left behind, so it can
+#          be offered for recovery without logging a timer another
+#          TimelyTrack is still running
+# inputs: timer record, this process's owner name
+# returns: True if nobody is running the timer
+#####
+def timer_abandoned(record, owner):
+    if record.get('owner') is None:
+        # written by an older version
+        return True
+    if record['owner'] in (owner, CLI_TIMER_OWNER):
+        return False
+    host, _, pid = record['owner'].rpartition(':')
+    if host == owner.rpartition(':')[0]:
+        alive = process_alive(int(pid))
+        if alive is not None:
+            return not alive
+    return time.time() - record['updated'] > CHECKPOINT_STALE_INTERVALS * CHECKPOINT_INTERVAL
+
+#####
+# purpose: loads the running timer checkpoint
+# inputs: none
+# returns: list of timer records, empty if there is no checkpoint
+#####
+def load_timer_checkpoint():
+    try:
+        with open(TIMER_CHECKPOINT_FILE, 'r') as file:
+            records = json.load(file)
+    except (OSError, ValueError):
+        return []
+    return records if isinstance(records, list) else []
+
+#####
+# purpose: writes the running timer checkpoint with a temp file and rename,
+#          removing it once no timers are running
+# inputs: list of timer records
+#####
+def save_timer_checkpoint(records):
+    if not records:
+        if os.path.exists(TIMER_CHECKPOINT_FILE):
+            os.remove(TIMER_CHECKPOINT_FILE)
+        return
+
+    write_atomic(TIMER_CHECKPOINT_FILE, json.dumps(records))
+
+#####
+# purpose: hours a checkpointed timer had run when it was last saved
+# inputs: timer record
+#####
+def checkpoint_hours(record):
+    end = record['paused_at'] if record['paused_at'] is not None else record['updated']
+    return round(max(end - record['start'] - record['paused_seconds'], 0) / 3600, 2)
+
+#####
+# purpose: runs a timer until Enter is pressed, redrawing only when the
+#          elapsed hours shown change
+# inputs: project name
+# returns: elapsed hours rounded to 2 decimal places
+#####
+def run_timer(project, timer=None):
+    if timer is None:
+        timer = Timer(project)
+    print('-' * len('  Timer started. Press Enter to stop the timer  '))
+    print('Timer started. Press Enter to stop the timer.')
+
+    # checkpoint the timer so it survives the process dying
+    timer_sessions.foreground = timer
+    timer_sessions.save_checkpoint()
+    next_checkpoint = time.monotonic() + CHECKPOINT_INTERVAL
+
+    shown = None
+    try:
+        with timer_keyboard():
+            while True:
+                elapsed = timer.elapsed()
+                elapsed_time = round(elapsed / 3600, 2)
+
+                # Output elapsed time when the displayed value changes
+                if elapsed_time != shown:
+                    print(f'\rElapsed Time: {elapsed_time} hours', end='', flush=True)
+                    shown = elapsed_time
+
+                if time.monotonic() >= next_checkpoint:
+                    timer_sessions.save_checkpoint()
+                    next_checkpoint = time.monotonic() + CHECKPOINT_INTERVAL
+
+                # Sleep until Enter is pressed, the display needs updating
+                # or the checkpoint is due
+                timeout = min(seconds_to_next_display(elapsed), next_checkpoint - time.monotonic())
+                if wait_for_enter(timeout):
+                    print('\n' + '-' * len('  Timer started. Press Enter to stop the timer  '))
+                    break
+    finally:
+        timer_sessions.foreground = None
+        timer_sessions.save_checkpoint()
+
+    return timer.hours()
+
+#####
+# purpose: imports asyncio for the timer sessions, the only part of the
+#          menus that needs it, so starting up does not pay for it
+# inputs: none
+# returns: asyncio module
+#####
+def load_asyncio():
+    import asyncio
+
+    return asyncio
+
+#####
+# purpose: runs several named timers at once on an asyncio event loop,
+#          timers cost nothing while they run so overhead per timer is
+#          constant however many there are
+# inputs: function called with (project, hours) when a timer stops,
+#         log_time by default
+#####
+class TimerSessions:
+    def __init__(self, log=None, checkpoint=True):
+        self.timers = {}
+        self.log = log if log is not None else log_time
+        # timer started from the Projects menu, checkpointed with the rest
+        self.foreground = None
+        self.checkpoint = checkpoint
+        self.dirty = False
+        self.heartbeat = None
+        # made with the heartbeat thread, the file lock does not keep two
+        # threads of one process apart
+        self.lock = None
+
+    def _timer(self, name):
+        if name not in self.timers:
+            raise KeyError(f'No timer named {name!r}')
+        return self.timers[name]
+
+    async def start(self, name, project):
+        if name in self.timers:
+            raise ValueError(f'A timer named {name!r} is already running')
+        self.timers[name] = Timer(project)
+        self.dirty = True
+        return self.timers[name]
+
+    async def pause(self, name):
+        self._timer(name).pause()
+        self.dirty = True
+
+    async def resume(self, name):
+        self._timer(name).resume()
+        self.dirty = True
+
+    # stops a timer and hands its hours to the log function, which runs
+    # in a worker thread so a prompt for a comment does not block the loop
+    async def stop(self, name):
+        timer = self._timer(name)
+        del self.timers[name]
+        self.dirty = True
+        hours = timer.hours()
+        await load_asyncio().to_thread(self.log, timer.project, hours)
+        return hours
+
+    # writes this process's running timers to the checkpoint file, in
+    # place of the records it wrote last time and next to those of other
+    # processes and the command line, re-read under the lock they write
+    # it with
+    def save_checkpoint(self):
+        if not self.checkpoint:
+            return
+        owner = checkpoint_owner()
+        records = [timer.to_record(name) for name, timer in list(self.timers.items())]
+        if self.foreground is not None:
+            records.append(self.foreground.to_record())
+        for record in records:
+            record['owner'] = owner
+        with self.lock or contextlib.nullcontext(), file_lock(TIMER_CHECKPOINT_FILE):
+            others = [record for record in load_timer_checkpoint() if record.get('owner') != owner]
+            save_timer_checkpoint(others + records)
+        self.dirty = False
+        if records:
+            self.start_heartbeat()
+
+    # keeps the checkpoint's 'updated' times current while timers run,
+    # whichever menu is open, so other processes can tell they are alive
+    def start_heartbeat(self):
+        if self.heartbeat is not None:
+            return
+        import threading
+
+        self.lock = threading.Lock()
+
+        def beat():
+            while True:
+                time.sleep(CHECKPOINT_INTERVAL)
+                if self.timers or self.foreground is not None:
+                    self.save_checkpoint()
+
+        self.heartbeat = threading.Thread(target=beat, daemon=True)
+        self.heartbeat.start()
+
+timer_sessions = TimerSessions()
+
+#####
+# purpose: picks one of the running timers by number
+# inputs: sorted timer names, user's choice
+# returns: timer name or None
+#####
+def choose_timer(names, choice):
+    try:
+        choice = int(choice)
+    except ValueError:
+        return None
+    return names[choice - 1] if 1 <= choice <= len(names) else None
+
+#####
+# purpose: menu to start, pause, resume and stop concurrent timers, input
+#          is read in a worker thread so the event loop keeps running
+# inputs: menu options
+#####
+async def timer_sessions_loop():
+    to_thread = load_asyncio().to_thread
+    while True:
+        if timer_sessions.dirty:
+            timer_sessions.save_checkpoint()
+
+        clear_screen()
+        names = sorted(timer_sessions.timers)
+        print('-' * len(f'  Timer Sessions  ') + f'\n  Timer Sessions')
+        print('-' * len(f'  Timer Sessions  '))
+        for i, name in enumerate(names, start=1):
+            timer = timer_sessions.timers[name]
+            state = 'paused' if timer.paused else 'running'
+            print(f'{i}. {name} ({timer.project}): {timer.hours()} hours [{state}]')
+
+        print('S. Start a timer')
+        print('P. Pause a timer')
+        print('R. Resume a timer')
+        print('X. Stop a timer and log time')
+        print('0. Back to Projects Menu')
+        print('-' * len(f'  Timer Sessions  '))
+
+        choice = (await to_thread(input, 'Select an option\n~>')).upper()
+
+        if choice == '0':
+            clear_screen()
+            break
+        elif choice == 'S':
+            option, selected = await to_thread(
+                pick_projects, 'Start a Timer', "Select a project, or '0' to go back",
+                (('0', 'Back to Timer Sessions'),))
+            if option == '0':
+                continue
+            project = selected[0]
+            name = await to_thread(input, f"Timer name (Enter for '{project}')\n~>")
+            try:
+                await timer_sessions.start(name or project, project)
+            except ValueError as error:
+                print(error)
+                await to_thread(input, 'Press Enter to continue...')
+        elif choice in ('P', 'R', 'X'):
+            name = choose_timer(names, await to_thread(input, 'Select a timer\n~>'))
+            if name is None:
+                continue
+            if choice == 'P':
+                await timer_sessions.pause(name)
+            elif choice == 'R':
+                await timer_sessions.resume(name)
+            else:
+                await timer_sessions.stop(name)
+
+#####
+# purpose: opens the timer sessions menu
+# inputs: none
+#####
+def timer_sessions_menu():
+    load_asyncio().run(timer_sessions_loop())
 
-    # Write the entry to the time log file
-    with open('time_log.txt', 'a') as file:
-        file.write(entry)
+#####
+# purpose: offers to resume or log timers left running by a process that
+#          died, costs one small file read at startup. Timers another
+#          TimelyTrack is still running are left alone.
+# inputs: menu options
+#####
+def recover_timers():
+    owner = checkpoint_owner()
+    # claim them first so another process starting now does not offer
+    # them too, they are back in the checkpoint as ours after the choices
+    with file_lock(TIMER_CHECKPOINT_FILE):
+        records = load_timer_checkpoint()
+        abandoned = [record for record in records if timer_abandoned(record, owner)]
+        if not abandoned:
+            return
+        for record in abandoned:
+            record['owner'] = owner
+        save_timer_checkpoint(records)
+
+    resume_foreground = None
+    for record in abandoned:
+        timer = Timer.from_record(record)
+        label = record['name'] or record['project']
+        print('-' * len(f'  Unfinished timer: {label}  ') + f'\n  Unfinished timer: {label}')
+        print('-' * len(f'  Unfinished timer: {label}  '))
+        print(f'R. Resume the timer ({timer.hours()} hours so far)')
+        print(f'L. Log time up to the last checkpoint ({checkpoint_hours(record)} hours)')
+        print(f'N. Log time up to now ({timer.hours()} hours)')
+        print('D. Discard the timer')
+        choice = input('Select an option\n~>').upper()
+
+        if choice == 'R':
+            if record['name'] is None:
+                resume_foreground = timer
+            else:
+                timer_sessions.timers[record['name']] = timer
+        elif choice == 'L':
+            log_time(record['project'], checkpoint_hours(record))
+        elif choice == 'N':
+            log_time(record['project'], timer.hours())
+        elif choice != 'D':
+            # keep it for next time rather than losing it
+            timer_sessions.timers[label] = timer
+
+    timer_sessions.save_checkpoint()
+    if resume_foreground is not None:
+        hours = run_timer(resume_foreground.project, resume_foreground)
+        log_time(resume_foreground.project, hours)
+    clear_screen()
 
 #####
 # purpose: saves New Project/project info 
@@ -107,85 +887,168 @@ def new_project():
     print('-' * len(f'  New Project  ') + f'\n  New Project')
     print('-' * len(f'  New Project  '))
     name = input(' Enter project name\n~>')
-    save_project(name)
+    try:
+        save_project(name)
+    except ValueError as error:
+        print(error)
+        input('Press Enter to continue...')
     clear_screen()
 
 #####
-# purpose: provides menu to select and add time to existing projects
-# inputs: menu options, comments and time
+# number of projects shown per page of the project picker, how many
+# recently used projects are listed first, and what lettered options and
+# paging start with so single letters can still filter the list
 #####
-def existing_project():
+PICKER_PAGE_SIZE = 20
+RECENT_PROJECTS_LIMIT = 10
+PICKER_COMMAND_PREFIX = ':'
+
+#####
+# purpose: loads the most recently used projects, newest first
+# inputs: none
+#####
+def recent_projects():
+    try:
+        with open(RECENT_PROJECTS_FILE, 'r') as file:
+            return [line.rstrip('\n') for line in file]
+    except FileNotFoundError:
+        return []
+
+#####
+# purpose: moves a project to the front of the recently used list
+# inputs: project name
+#####
+def remember_project(name):
+    recent = [name] + [project for project in recent_projects() if project != name]
+    write_atomic(RECENT_PROJECTS_FILE, ''.join(project + '\n' for project in recent[:RECENT_PROJECTS_LIMIT]))
+
+#####
+# purpose: shows a picker option's key, letters take the command prefix
+# inputs: option key
+#####
+def picker_key(key):
+    return key if key.isdigit() else PICKER_COMMAND_PREFIX + key
+
+#####
+# purpose: shared project picker with type-to-filter, paging and recently
+#          used projects first, only the projects on the current page are
+#          looked up so redraws do not depend on the number of projects
+# inputs: menu title, prompt, extra (key, label) options, whether several
+#         projects can be picked, whether to remember the pick as recent
+# returns: (option key, []) if an option was chosen, else (None, projects)
+#####
+def pick_projects(title, prompt, options=(('0', 'Back'),), multiple=False, remember=True):
+    keys = {key for key, label in options}
+    filter_text = ''
+    page = 0
+
     while True:
-        # Clear the screen
         clear_screen()
-
-        projects = list_projects()
-        print('-' * len(f'  Projects Menu  ') + f'\n  Projects Menu')
-        print('-' * len(f'  Projects Menu  '))
-        for i, project in enumerate(projects, start=1):
+        index = get_registry().index()
+        matches = index.search(filter_text, recent_projects())
+        shown = list(itertools.islice(matches, page * PICKER_PAGE_SIZE, (page + 1) * PICKER_PAGE_SIZE + 1))
+        has_next = len(shown) > PICKER_PAGE_SIZE
+        del shown[PICKER_PAGE_SIZE:]
+
+        print('-' * len(f'  {title}  ') + f'\n  {title}')
+        print('-' * len(f'  {title}  '))
+        if filter_text:
+            print(f"Filter: '{filter_text}'")
+        for i, project in enumerate(shown, start=1):
             print(f'{i}. {project}')
+        if not shown:
+            print('No matching projects.')
+
+        if page > 0:
+            print(f'{picker_key("P")}. Previous page')
+        if has_next:
+            print(f'{picker_key("N")}. Next page')
+        if filter_text:
+            print('/. Clear filter')
+        for key, label in options:
+            print(f'{picker_key(key)}. {label}')
+        print('-' * len(f'  {title}  '))
+
+        choice = input(f'{prompt}, or type to filter (start with / to filter by digits)\n~>').strip()
+        # letters are filter text unless they follow the command prefix
+        command = choice[len(PICKER_COMMAND_PREFIX):].upper() if choice.startswith(PICKER_COMMAND_PREFIX) \
+            else choice if choice.isdigit() else None
+
+        if command in keys:
+            return command, []
+        elif command == 'N' and has_next:
+            page += 1
+        elif command == 'P' and page > 0:
+            page -= 1
+        elif command is not None and not command.isdigit():
+            print('Invalid choice. Please try again.')
+        elif choice == '/':
+            filter_text = ''
+            page = 0
+        elif choice[:1].isdigit():
+            try:
+                numbers = parse_selection(choice, len(shown))
+                if not multiple and len(numbers) != 1:
+                    raise ValueError('Invalid choice. Please try again.')
+            except ValueError as error:
+                print(error)
+                continue
 
-        print('H. Historic Time Entry')
-        print('0. Back to Main Menu')
-        print('-' * len(f'  Projects Menu  '))
-        
-        choice = input("Select a project, 'H' for historic time entry, or '0' to go back\n~>")
+            selected = [shown[number - 1] for number in numbers]
+            if remember:
+                for project in selected:
+                    remember_project(project)
+            return None, selected
+        elif choice:
+            # anything else narrows the list
+            filter_text = choice.lstrip('/')
+            page = 0
+
+#####
+# purpose: provides menu to select and add time to existing projects
+# inputs: menu options, comments and time
+#####
+def existing_project():
+    while True:
+        choice, selected = pick_projects(
+            'Projects Menu',
+            "Select a project, ':h' for historic time entry, ':t' for timer sessions, ':i' to import a CSV, or '0' to go back",
+            (('H', 'Historic Time Entry'), ('T', 'Timer Sessions'), ('I', 'Import CSV'), ('0', 'Back to Main Menu')))
 
         if choice == '0':
             # Clear the screen before breaking out of the loop
             clear_screen()
             break
-        elif choice.upper() == 'H':
+        elif choice == 'H':
             manual_time_entry()
+        elif choice == 'T':
+            timer_sessions_menu()
+        elif choice == 'I':
+            import_csv_menu()
         else:
-            try:
-                choice = int(choice)
-                if 1 <= choice <= len(projects):
-                    selected_project = projects[choice - 1]
-
-                    # Ask the user if they want to start a timer or enter time manually
-                    timer_choice = input(f"Do you want to start a timer for '{selected_project}'? (y/n)\n~>").lower()
-
-                    if timer_choice == 'y':
-                        # Start the timer
-                        start_time = time.time()
-                        print('-' * len('  Timer started. Press Enter to stop the timer  '))
-                        print('Timer started. Press Enter to stop the timer.')
-
-                        while True:
-                            # Calculate elapsed time and round to 2 decimal places
-                            elapsed_time = round((time.time() - start_time) / 3600, 2)
-
-                            # Output elapsed time in real-time
-                            print(f'\rElapsed Time: {elapsed_time} hours', end='', flush=True)
-
-                            # Check if Enter key is pressed
-                            if msvcrt.kbhit() and msvcrt.getch() == b'\r':
-                                print('\n' + '-' * len('  Timer started. Press Enter to stop the timer  '))
-                                break
+            selected_project = selected[0]
 
-                            # Wait for a short interval before checking elapsed time again
-                            time.sleep(0.1)
+            # Ask the user if they want to start a timer or enter time manually
+            timer_choice = input(f"Do you want to start a timer for '{selected_project}'? (y/n)\n~>").lower()
 
-                        # Stop the timer
-                        end_time = time.time()
-                        elapsed_time = round((end_time - start_time) / 3600, 2)  # Convert seconds to hours and round to 2 decimal places
+            if timer_choice == 'y':
+                # Run the timer until Enter is pressed
+                elapsed_time = run_timer(selected_project)
 
-                        # Log the elapsed time
-                        log_time(selected_project, elapsed_time)
+                # Log the elapsed time
+                log_time(selected_project, elapsed_time)
 
-                        # Clear the screen after logging time
-                        clear_screen()
-                    elif timer_choice == 'n':
-                        # User wants to enter time manually
-                        hours = float(input('Enter hours worked\n~>'))
-                        log_time(selected_project, round(hours, 2))  # Round the entered hours to 2 decimal places
-                    else:
-                        print("Invalid choice. Please enter 'y' or 'n'\n~>")
-                else:
-                    print('Invalid choice. Please try again.')
-            except ValueError:
-                print('Invalid input. Please enter a number.')
+                # Clear the screen after logging time
+                clear_screen()
+            elif timer_choice == 'n':
+                # User wants to enter time manually
+                try:
+                    hours = parse_hours(input('Enter hours worked\n~>'))
+                    log_time(selected_project, hours)
+                except ValueError:
+                    print('Invalid input. Please enter a number.')
+            else:
+                print("Invalid choice. Please enter 'y' or 'n'\n~>")
 
 #####
 # purpose: provides option to manually enter time from previous 3 days
@@ -217,37 +1080,23 @@ def manual_time_entry():
                                 datetime.date.today() - datetime.timedelta(days=int(choice))
                 selected_date_str = selected_date.strftime('%Y-%m-%d')
 
-                # Clear the screen
-                clear_screen()
-
-                projects = list_projects()
-                print('-' * len(f'  Projects  ') + f'\n  Projects')
-                print('-' * len(f'  Projects  '))
-                for i, project in enumerate(projects, start=1):
-                    print(f'{i}. {project}')
-
-                print('\n0. Back to Previous Menu')
-
-                project_choice = input("Select a Project to manually enter time, or '0' to go back\n~>")
+                project_choice, selected = pick_projects(
+                    'Projects', "Select a Project to manually enter time, or '0' to go back",
+                    (('0', 'Back to Previous Menu'),))
 
                 if project_choice == '0':
                     # Clear the screen before going back to the previous menu
                     clear_screen()
                     continue
                 else:
+                    selected_project = selected[0]
                     try:
-                        project_choice = int(project_choice)
-                        if 1 <= project_choice <= len(projects):
-                            selected_project = projects[project_choice - 1]
-
-                            # Prompt the user to enter hours worked
-                            hours = float(input(f" Enter hours worked for '{selected_project}' on {selected_date_str}\n~>"))
-                            log_time(selected_project, round(hours, 2), selected_date_str)  # Round the entered hours to 2 decimal places
-
-                            # Clear the screen after logging time
-                            clear_screen()
-                        else:
-                            print('Invalid choice. Please try again.')
+                        # Prompt the user to enter hours worked
+                        hours = parse_hours(input(f" Enter hours worked for '{selected_project}' on {selected_date_str}\n~>"))
+                        log_time(selected_project, hours, selected_date_str)
+
+                        # Clear the screen after logging time
+                        clear_screen()
                     except ValueError:
                         print('Invalid input. Please enter a number.')
 
@@ -262,84 +1111,1481 @@ def manual_time_entry():
 #####
 def delete_projects_menu():
     while True:
-        clear_screen()
-        projects = list_projects()
-        print('-' * len(f'  Delete Projects Menu  ') + f'\n  Delete Projects Menu')
-        print('-' * len(f'  Delete Projects Menu  '))
-        for i, project in enumerate(projects, start=1):
-            print(f'{i}. {project}')
-
-        print('0. Back to Main Menu')
-        print('-' * len(f'  Delete Projects Menu  '))
-
-        choice = input('Select a project to delete or enter "0" to go back\n~>')
+        choice, selected_projects = pick_projects(
+            'Delete Projects Menu',
+            'Select projects to delete (e.g. 2 or 1,3,5-7) or enter "0" to go back',
+            (('0', 'Back to Main Menu'),), multiple=True, remember=False)
 
         if choice == '0':
             clear_screen()
             break
 
+        delete_projects(selected_projects)
+        print(f'{", ".join(selected_projects)} deleted successfully!')
+        input('Press Enter to continue...')
+
+#####
+# purpose: turns a selection like "1,3,5-7" into menu numbers
+# inputs: user's selection, number of menu items
+# returns: sorted list of unique numbers
+#####
+def parse_selection(selection, count):
+    numbers = set()
+    for part in selection.replace(' ', '').split(','):
+        first, _, last = part.partition('-')
         try:
-            choice = int(choice)
-            if 1 <= choice <= len(projects):
-                selected_project = projects[choice - 1]  # Get the selected project name
-                delete_project(selected_project)  # Pass the selected project name
-                print(f'{selected_project} deleted successfully!')
-                input('Press Enter to continue...')
-            else:
-                print('Invalid choice. Please try again.')
+            first = int(first)
+            last = int(last) if last else first
         except ValueError:
-            print('Invalid input. Please enter a number.')
+            raise ValueError('Invalid input. Please enter numbers like 2 or 1,3,5-7.') from None
+        if not 1 <= first <= last <= count:
+            raise ValueError('Invalid choice. Please try again.')
+        numbers.update(range(first, last + 1))
+    return sorted(numbers)
+
+#####
+# size of the blocks the time log is read in
+#####
+READ_CHUNK_SIZE = 1024 * 1024
+
+#####
+# purpose: streams raw time log lines starting at a byte offset, reading
+#          the file in large chunks so memory stays flat as the log grows
+# inputs: byte offset to start reading from, chunk size in bytes,
+#         complete_only to stop before an unterminated last line,
+#         path of the log file (time_log.txt or a shard)
+# returns: (offset after the line, line text without the newline) per line
+#####
+def read_log_lines(offset=0, chunk_size=READ_CHUNK_SIZE, complete_only=False, path=TIME_LOG_FILE):
+    encoding = locale.getpreferredencoding(False)
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        pending = b''
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            # the last piece has no newline yet, carry it into the next chunk
+            pending = lines.pop()
+            for raw in lines:
+                offset += len(raw) + 1
+                yield offset, raw.decode(encoding, errors='replace')
+
+        if pending and not complete_only:
+            yield offset + len(pending), pending.decode(encoding, errors='replace')
+
+#####
+# purpose: reads time log entries in the order they were written
+# inputs: optional first and last date (YYYY-MM-DD) to include, optional
+#         report cache already in memory to take the date index from
+#####
+def read_time_log(start_date=None, end_date=None, cache=None):
+    # seek past the part of the log written before start_date
+    if start_date is None:
+        offset = 0
+    elif cache is not None:
+        offset = cache_date_offset(cache, start_date)
+    else:
+        offset = find_date_offset(start_date)
+    for offset, line in read_log_lines(offset):
+        entry = parse_entry(line)
+        if entry is None:
+            continue
+        date = entry[0]
+        if start_date is not None and date < start_date:
+            continue
+        if end_date is not None and date > end_date:
+            continue
+        yield entry
+
+#####
+# purpose: adds one entry's hours to the per-project and per-date totals
+# inputs: totals {project: hours}, days {date: {project: hours}}, entry parts
+#####
+def add_to_totals(totals, days, date, project, hours):
+    totals[project] = totals.get(project, 0) + hours
+    daily_totals = days.setdefault(date, {})
+    daily_totals[project] = daily_totals.get(project, 0) + hours
+
+#####
+# purpose: walks the stored entries once and builds per-date/per-project totals
+# inputs: optional first and last date (YYYY-MM-DD) to include,
+#         keep_entries to also collect the matching entries in log order
+# returns: dict with 'totals' {project: hours}, 'days' {date: {project: hours}}
+#          and 'entries' [(date, project, hours, comment)]
+#####
+def aggregate_time_log(start_date=None, end_date=None, keep_entries=False):
+    totals = {}
+    days = {}
+    entries = []
+
+    for entry in get_storage().iter_entries(start_date, end_date):
+        date, project, hours, comment = entry
+        add_to_totals(totals, days, date, project, hours)
+
+        if keep_entries:
+            entries.append(entry)
+
+    return {'totals': totals, 'days': days, 'entries': entries}
 
 #####
-# purpose: to output time log to terminal
+# report cache, in two files so the all-time totals are read without the
+# per-day history. time_log.cache is a small header with the totals for
+# every complete line up to 'offset' in the time log, the log's
+# size/mtime/inode and the bytes just before 'offset' so appends can be
+# told apart from rewrites, and how much of the days file belongs to it.
+# time_log.cache.days has a JSON line per refresh with the hours it added
+# per date and project and the byte offset where each new date first
+# appears ('first'). Refreshes append a line, once there are
+# CACHE_DAYS_COMPACT_LINES of them the file is rewritten as one line under
+# a new 'generation'.
+#####
+CACHE_VERSION = 3
+CACHE_FINGERPRINT_BYTES = 64
+CACHE_DAYS_COMPACT_LINES = 500
+
+#####
+# purpose: reads the bytes just before an offset to fingerprint the log
+# inputs: time log opened in binary mode, byte offset
+#####
+def read_cache_fingerprint(file, offset):
+    start = max(0, offset - CACHE_FINGERPRINT_BYTES)
+    file.seek(start)
+    return file.read(offset - start).hex()
+
+#####
+# purpose: loads the report cache header from disk
 # inputs: none
+# returns: cache dict without the per-day data, or None if it is missing
+#          or unreadable
 #####
-def display_time_log():
-    with open('time_log.txt', 'r') as file:
-        time_log = file.readlines()
-    clear_screen()
-    
-    if time_log:
-        total_time_worked = {}
-        #grand_totals = {}
+def load_time_log_cache():
+    try:
+        with open(TIME_LOG_CACHE_FILE, 'r') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return None
+    return cache
 
-        current_date = None
-        daily_totals = {}
-
-        for entry in time_log:
-            parts = entry.strip().split(' - ', 1)
-            if len(parts) == 2:
-                timestamp, entry_data = parts
-                date = timestamp.split()[0]
-
-                if date != current_date:
-                    # Display timestamped entries under 'Time Log' section
-                    print('-' * len(f'{date} Time Log') + f'\n{date} Time Log')
-                    print('-' * len(f'{date} Time Log'))
-                    current_date = date
-                    
-                    # Reset daily_totals for the new date
-                    daily_totals = {}
-
-                # Process 'Time Log' entries for calculating totals
-                project, hours = entry_data.split(': ')
-                hours = float(hours.split()[0])
-
-                if project in total_time_worked:
-                    total_time_worked[project] += hours
-                else:
-                    total_time_worked[project] = hours
+#####
+# purpose: adds per-day totals and first offsets from the days file or a
+#          refresh into the ones already collected, the earliest first
+#          offset of a date wins
+# inputs: days {date: {project: hours}}, first offsets {date: offset},
+#         per-day totals and first offsets to add
+#####
+def merge_cache_days(days, first_offsets, new_days, new_first):
+    for date, daily_totals in new_days.items():
+        totals = days.setdefault(date, {})
+        for project, hours in daily_totals.items():
+            totals[project] = totals.get(project, 0) + hours
+    for date, offset in new_first.items():
+        first_offsets.setdefault(date, offset)
 
-                if project in daily_totals:
-                    daily_totals[project] += hours
+#####
+# purpose: adds the per-day totals ('days') and date index ('first_offsets')
+#          to a cache loaded without them, replaying the days file lines
+# inputs: cache dict
+# returns: False if the days file does not match the header
+#####
+def load_cache_days(cache):
+    if 'days' in cache:
+        return True
+    try:
+        with open(TIME_LOG_CACHE_DAYS_FILE, 'rb') as file:
+            data = file.read(cache['days_size'])
+    except OSError:
+        return False
+    if len(data) != cache['days_size']:
+        return False
+
+    days = {}
+    first_offsets = {}
+    for line in data.splitlines():
+        try:
+            part = json.loads(line)
+        except ValueError:
+            return False
+        # rewritten by another process since the header was read
+        if part.get('generation') != cache['generation']:
+            return False
+        merge_cache_days(days, first_offsets, part['days'], part['first'])
+    cache['days'] = days
+    cache['first_offsets'] = first_offsets
+    return True
+
+#####
+# purpose: writes the report cache, appending the last refresh's per-day
+#          totals to the days file and replacing the small header. The
+#          days file is rewritten whole after a rebuild, when it has
+#          grown to CACHE_DAYS_COMPACT_LINES lines, or when another process
+#          saved a different cache since this one was loaded.
+# inputs: cache dict
+#####
+def save_time_log_cache(cache):
+    delta = cache.pop('delta', None)
+    with file_lock(TIME_LOG_CACHE_FILE):
+        current = load_time_log_cache()
+        extend = current is not None and current['generation'] == cache['generation'] \
+            and current['days_size'] == cache['days_size']
+        if extend and cache['days_lines'] >= CACHE_DAYS_COMPACT_LINES:
+            # compact, loading the days first if this refresh did not
+            if 'days' in cache:
+                extend = False
+            elif load_cache_days(cache):
+                # the file does not have the last refresh yet
+                if delta is not None:
+                    merge_cache_days(cache['days'], cache['first_offsets'], delta['days'], delta['first'])
+                extend = False
+        if not extend and 'days' not in cache:
+            # another process saved first, its cache covers these lines too
+            return
+
+        if extend:
+            if delta is not None and (delta['days'] or delta['first']):
+                line = json.dumps({'generation': cache['generation'], **delta}).encode() + b'\n'
+                fd = os.open(TIME_LOG_CACHE_DAYS_FILE, os.O_WRONLY | os.O_CREAT, 0o666)
+                try:
+                    # drop anything a save that failed left past the header's size
+                    os.ftruncate(fd, cache['days_size'])
+                    os.lseek(fd, 0, os.SEEK_END)
+                    write_all(fd, line)
+                finally:
+                    os.close(fd)
+                cache['days_size'] += len(line)
+                cache['days_lines'] += 1
+        else:
+            cache['generation'] = os.urandom(8).hex()
+            line = json.dumps({'generation': cache['generation'], 'days': cache['days'],
+                               'first': cache['first_offsets']}) + '\n'
+            write_atomic(TIME_LOG_CACHE_DAYS_FILE, line)
+            cache['days_size'] = len(line.encode())
+            cache['days_lines'] = 1
+
+        header = {key: value for key, value in cache.items() if key not in ('days', 'first_offsets')}
+        write_atomic(TIME_LOG_CACHE_FILE, json.dumps(header))
+
+#####
+# purpose: checks whether the time log has only been appended to since
+#          the cache was built
+# inputs: cache dict, os.stat of the time log, time log opened in binary mode
+#####
+def cache_matches_log(cache, stat, file):
+    if cache['inode'] != stat.st_ino or stat.st_size < cache['offset']:
+        # replaced or truncated
+        return False
+    if stat.st_size == cache['size']:
+        # same size but a new mtime means it was rewritten in place
+        return False
+    return read_cache_fingerprint(file, cache['offset']) == cache['tail']
+
+#####
+# purpose: brings the report cache up to date with the time log, parsing
+#          only the bytes appended since it was built and rebuilding it
+#          from scratch if the log was rewritten or truncated
+# inputs: days to also load the per-day totals and date index
+# returns: cache dict with 'totals', and 'days' and 'first_offsets' if asked
+#####
+def refresh_time_log_cache(days=False):
+    stat = os.stat(TIME_LOG_FILE)
+    cache = load_time_log_cache()
+    if cache is not None and days and not load_cache_days(cache):
+        # the days file is missing or was replaced, start again
+        cache = None
+    if cache is not None and cache['size'] == stat.st_size \
+            and cache['mtime'] == stat.st_mtime_ns and cache['inode'] == stat.st_ino:
+        return cache
+
+    cache = update_time_log_cache(cache, stat)
+    save_time_log_cache(cache)
+    return cache
+
+#####
+# purpose: folds the lines appended to the time log since a cache was
+#          built into it, or rebuilds it if the log was rewritten or
+#          truncated, without saving it. The per-day totals added are kept
+#          in 'delta' for the next save, and folded into 'days' too if the
+#          cache has them loaded.
+# inputs: cache dict or None, os.stat of the time log
+# returns: updated cache dict
+#####
+def update_time_log_cache(cache, stat):
+    with open(TIME_LOG_FILE, 'rb') as file:
+        if cache is None or not cache_matches_log(cache, stat, file):
+            cache = {'version': CACHE_VERSION, 'generation': None, 'offset': 0, 'totals': {},
+                     'days_size': 0, 'days_lines': 0, 'days': {}, 'first_offsets': {}}
+
+        # an unterminated last line is a write in progress, leave it for
+        # the next refresh
+        new_days = {}
+        new_first = {}
+        first_offsets = cache.get('first_offsets', {})
+        offset = line_start = cache['offset']
+        for offset, line in read_log_lines(offset, complete_only=True):
+            entry = parse_entry(line)
+            if entry is not None:
+                add_to_totals(cache['totals'], new_days, *entry[:3])
+                # without the date index loaded a date seen before is kept
+                # too, replaying the days file keeps its first offset
+                if entry[0] not in first_offsets and entry[0] not in new_first:
+                    new_first[entry[0]] = line_start
+            line_start = offset
+
+        cache['offset'] = offset
+        cache['tail'] = read_cache_fingerprint(file, offset)
+
+    if 'days' in cache:
+        merge_cache_days(cache['days'], cache['first_offsets'], new_days, new_first)
+    cache['delta'] = {'days': new_days, 'first': new_first}
+    cache['size'] = stat.st_size
+    cache['mtime'] = stat.st_mtime_ns
+    cache['inode'] = stat.st_ino
+    return cache
+
+#####
+# purpose: finds where to start reading the time log for entries on or
+#          after a date from the date index in the report cache, building
+#          the cache if there is none. Entries can be logged with any date
+#          (CSV import, log --date, the JSON API), so the log is not sorted
+#          enough to search without the index.
+# inputs: date (YYYY-MM-DD)
+# returns: byte offset of a line start
+#####
+def find_date_offset(date):
+    return cache_date_offset(refresh_time_log_cache(days=True), date)
+
+#####
+# purpose: looks up where to start reading for a date in the report
+#          cache's date index
+# inputs: cache dict, date (YYYY-MM-DD)
+# returns: byte offset of a line start
+#####
+def cache_date_offset(cache, date):
+    # back-dated entries can appear after later dates, so start at the
+    # earliest first offset of any date in range
+    offsets = [offset for entry_date, offset in cache['first_offsets'].items()
+               if entry_date >= date]
+    return min(offsets) if offsets else cache['offset']
+
+#####
+# storage backends: every backend offers the same methods so the menus and
+# reports do not care where projects and entries live
+#####
+
+#####
+# deleted projects are appended to projects.txt as tombstone lines, the
+# file is compacted once this many have piled up
+#####
+PROJECT_TOMBSTONE = '-- deleted: '
+TOMBSTONE_COMPACT_THRESHOLD = 100
+
+#####
+# purpose: default backend, keeps projects.txt and time_log.txt and serves
+#          totals from the report cache
+#####
+class TextStorage:
+    name = 'text'
+
+    def __init__(self):
+        # tombstones seen by the last list_projects plus those added since
+        self.tombstones = 0
+
+    def list_projects(self):
+        names = []
+        deleted = {}
+        tombstones = 0
+        with open(PROJECTS_FILE, 'r') as file:
+            for number, line in enumerate(file):
+                # project names w/o newline chars
+                name = line.strip()
+                if name.startswith(PROJECT_TOMBSTONE):
+                    # remember the last deletion, the name may be added again later
+                    deleted[name[len(PROJECT_TOMBSTONE):]] = number
+                    tombstones += 1
                 else:
-                    daily_totals[project] = hours
+                    names.append((number, name))
+
+        self.tombstones = tombstones
+        return [name for number, name in names if number > deleted.get(name, -1)]
+
+    # changes whenever projects.txt is written
+    def projects_stamp(self):
+        stat = os.stat(PROJECTS_FILE)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    # changes whenever an entry is written
+    def entries_stamp(self):
+        return file_stamp(TIME_LOG_FILE)
+
+    def save_project(self, name):
+        if name.startswith(PROJECT_TOMBSTONE):
+            raise ValueError(f'Project names cannot start with {PROJECT_TOMBSTONE!r}')
+        append_lines(PROJECTS_FILE, [name + '\n'])
+
+    # appends a tombstone per project instead of rewriting the file
+    def delete_projects(self, names):
+        append_lines(PROJECTS_FILE, [f'{PROJECT_TOMBSTONE}{name}\n' for name in names])
+
+        self.tombstones += len(names)
+        if self.tombstones >= TOMBSTONE_COMPACT_THRESHOLD:
+            self.compact_projects()
+
+    # rewrites projects.txt without tombstones or deleted names
+    def compact_projects(self):
+        # hold the lock from the read to the rename so no append is lost
+        with file_lock(PROJECTS_FILE):
+            projects = self.list_projects()
+            write_atomic(PROJECTS_FILE, ''.join(project + '\n' for project in projects), fsync=True)
+        self.tombstones = 0
+
+    def append_entry(self, date, project, hours, comment=None):
+        self.append_entries([(date, project, hours, comment)])
+
+    # writes every entry in large O_APPEND writes under the log's lock
+    # with a single fsync
+    def append_entries(self, entries):
+        append_lines(TIME_LOG_FILE, (format_entry(*entry) for entry in entries))
+
+        # fold the new lines into the report cache if there is one, date
+        # reports build it when they first need its date index
+        if os.path.exists(TIME_LOG_CACHE_FILE):
+            refresh_time_log_cache()
+
+    def is_empty(self):
+        return os.path.getsize(TIME_LOG_FILE) == 0
+
+    def iter_entries(self, start_date=None, end_date=None):
+        return read_time_log(start_date, end_date)
+
+    def project_totals(self, start_date=None, end_date=None):
+        if start_date is None and end_date is None:
+            return refresh_time_log_cache()['totals']
+
+        totals = {}
+        for date, daily_totals in refresh_time_log_cache(days=True)['days'].items():
+            if (start_date is None or date >= start_date) and (end_date is None or date <= end_date):
+                for project, hours in daily_totals.items():
+                    totals[project] = totals.get(project, 0) + hours
+        return totals
+
+    def daily_totals(self, start_date=None, end_date=None):
+        days = refresh_time_log_cache(days=True)['days']
+        if start_date is None and end_date is None:
+            return days
+        return {date: daily_totals for date, daily_totals in days.items()
+                if (start_date is None or date >= start_date)
+                and (end_date is None or date <= end_date)}
 
-                # Display timestamped entry
-                print(f'{timestamp} - {entry_data}')
+#####
+# purpose: optional backend keeping projects and entries in an indexed
+#          SQLite database, reports are GROUP BY queries
+# inputs: database path
+#####
+class SqliteStorage:
+    name = 'sqlite'
+
+    def __init__(self, path=SQLITE_FILE):
+        import sqlite3
+
+        self.path = path
+        # wait for other processes' transactions rather than failing. The
+        # JSON API uses the connection from its request threads, one at a
+        # time under its lock.
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript('''
+                CREATE TABLE IF NOT EXISTS projects (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    project TEXT NOT NULL,
+                    hours REAL NOT NULL,
+                    comment TEXT
+                );
+                CREATE INDEX IF NOT EXISTS entries_date ON entries (date);
+                CREATE INDEX IF NOT EXISTS entries_project_date ON entries (project, date);
+            ''')
+
+    # builds the WHERE clause for an optional date range
+    def _date_range(self, start_date, end_date):
+        clauses = []
+        params = []
+        if start_date is not None:
+            clauses.append('date >= ?')
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append('date <= ?')
+            params.append(end_date)
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        return where, params
+
+    # changes whenever the database file is written
+    def projects_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    # the database file changes with every committed write
+    def entries_stamp(self):
+        return file_stamp(self.path)
+
+    def list_projects(self):
+        rows = self.connection.execute('SELECT name FROM projects ORDER BY id')
+        return [name for name, in rows]
+
+    def save_project(self, name):
+        with self.connection:
+            self.connection.execute('INSERT INTO projects (name) VALUES (?)', (name,))
+
+    def delete_projects(self, names):
+        with self.connection:
+            self.connection.executemany('DELETE FROM projects WHERE name = ?',
+                                        ((name,) for name in names))
+
+    def append_entry(self, date, project, hours, comment=None):
+        self.append_entries([(date, project, hours, comment)])
+
+    # inserts every entry in one transaction
+    def append_entries(self, entries):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO entries (date, project, hours, comment) VALUES (?, ?, ?, ?)',
+                ((date, project, hours, comment or None) for date, project, hours, comment in entries))
+
+    def is_empty(self):
+        return self.connection.execute('SELECT 1 FROM entries LIMIT 1').fetchone() is None
+
+    def iter_entries(self, start_date=None, end_date=None):
+        where, params = self._date_range(start_date, end_date)
+        return self.connection.execute(
+            'SELECT date, project, hours, comment FROM entries' + where + ' ORDER BY id', params)
+
+    def project_totals(self, start_date=None, end_date=None):
+        where, params = self._date_range(start_date, end_date)
+        rows = self.connection.execute(
+            'SELECT project, SUM(hours) FROM entries' + where
+            + ' GROUP BY project ORDER BY MIN(id)', params)
+        return dict(rows)
+
+    def daily_totals(self, start_date=None, end_date=None):
+        where, params = self._date_range(start_date, end_date)
+        rows = self.connection.execute(
+            'SELECT date, project, SUM(hours) FROM entries' + where
+            + ' GROUP BY date, project ORDER BY date, MIN(id)', params)
+        days = {}
+        for date, project, hours in rows:
+            days.setdefault(date, {})[project] = hours
+        return days
+
+    #####
+    # purpose: one-shot migration of projects.txt and time_log.txt
+    # inputs: none
+    # returns: number of entries imported
+    #####
+    def import_text_files(self):
+        text = TextStorage()
+        existing = set(self.list_projects())
+        with self.connection:
+            self.connection.executemany('INSERT INTO projects (name) VALUES (?)',
+                                        ((name,) for name in text.list_projects()
+                                         if name and name not in existing))
+            before = self.connection.total_changes
+            self.connection.executemany(
+                'INSERT INTO entries (date, project, hours, comment) VALUES (?, ?, ?, ?)',
+                text.iter_entries())
+            return self.connection.total_changes - before
+
+#####
+# columnar entry store: fixed-width little-endian records of
+#   day       date as a day number (date.toordinal())
+#   project   project ID, the line number in time_log.names
+#   hundredths hours in hundredths, log_time always rounds to 2 places
+#   comment offset and length of the UTF-8 comment in time_log.heap
+#####
+COLUMNAR_RECORD = struct.Struct('<iiiqI')
+COLUMNAR_FIELDS = ('day', 'project', 'hundredths', 'comment_offset', 'comment_length')
+COLUMNAR_TYPES = ('<i4', '<i4', '<i4', '<i8', '<u4')
+
+#####
+# purpose: imports NumPy if it is installed
+# inputs: none
+# returns: the numpy module or None
+#####
+def load_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+#####
+# purpose: optional backend keeping entries in a columnar binary file that
+#          is memory-mapped as NumPy arrays for vectorized totals, projects
+#          stay in projects.txt. Without NumPy the records are unpacked
+#          with struct instead.
+#####
+class ColumnarStorage(TextStorage):
+    name = 'columnar'
+
+    def __init__(self):
+        super().__init__()
+        self.names = []
+        self.ids = {}
+        self._load_names()
+
+    def _load_names(self):
+        try:
+            with open(COLUMNAR_NAMES_FILE, 'r', encoding='utf-8') as file:
+                self.names = [line.rstrip('\n') for line in file]
+        except FileNotFoundError:
+            self.names = []
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def _project_id(self, project):
+        if project not in self.ids:
+            with open(COLUMNAR_NAMES_FILE, 'a', encoding='utf-8') as file:
+                file.write(project + '\n')
+            self.ids[project] = len(self.names)
+            self.names.append(project)
+        return self.ids[project]
+
+    # appends entries, comments go to the heap before the records that
+    # point at them, each file is flushed and synced once
+    def append_entries(self, entries):
+        count = 0
+        day_numbers = {}
+        with file_lock(COLUMNAR_FILE), open(COLUMNAR_HEAP_FILE, 'ab') as heap, \
+                open(COLUMNAR_FILE, 'ab') as records:
+            # project IDs are assigned under the lock too
+            self._load_names()
+            heap_offset = heap.seek(0, os.SEEK_END)
+            for date, project, hours, comment in entries:
+                comment = (comment or '').encode('utf-8')
+                heap.write(comment)
+                day = day_numbers.get(date)
+                if day is None:
+                    day = day_numbers[date] = datetime.datetime.strptime(date, '%Y-%m-%d').toordinal()
+                records.write(COLUMNAR_RECORD.pack(day, self._project_id(project),
+                                                   round(hours * 100), heap_offset, len(comment)))
+                heap_offset += len(comment)
+                count += 1
+
+            for file in (heap, records):
+                file.flush()
+                os.fsync(file.fileno())
+        return count
+
+    def append_entry(self, date, project, hours, comment=None):
+        self.append_entries([(date, project, hours, comment)])
+
+    def _record_count(self):
+        try:
+            return os.path.getsize(COLUMNAR_FILE) // COLUMNAR_RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def is_empty(self):
+        return self._record_count() == 0
+
+    def entries_stamp(self):
+        return file_stamp(COLUMNAR_FILE)
+
+    #####
+    # purpose: loads the records matching a date range
+    # inputs: optional first and last date (YYYY-MM-DD)
+    # returns: NumPy structured array, or a list of record tuples without NumPy
+    #####
+    def _records(self, start_date=None, end_date=None):
+        self._load_names()
+        count = self._record_count()
+        first_day = datetime.datetime.strptime(start_date, '%Y-%m-%d').toordinal() if start_date else None
+        last_day = datetime.datetime.strptime(end_date, '%Y-%m-%d').toordinal() if end_date else None
+
+        numpy = load_numpy()
+        if numpy is not None:
+            dtype = numpy.dtype(list(zip(COLUMNAR_FIELDS, COLUMNAR_TYPES)))
+            if count == 0:
+                return numpy.zeros(0, dtype=dtype)
+            records = numpy.memmap(COLUMNAR_FILE, dtype=dtype, mode='r', shape=(count,))
+            if first_day is not None:
+                records = records[records['day'] >= first_day]
+            if last_day is not None:
+                records = records[records['day'] <= last_day]
+            return records
+
+        with open(COLUMNAR_FILE, 'rb') as file:
+            data = file.read(count * COLUMNAR_RECORD.size) if count else b''
+        return [record for record in COLUMNAR_RECORD.iter_unpack(data)
+                if (first_day is None or record[0] >= first_day)
+                and (last_day is None or record[0] <= last_day)]
+
+    def iter_entries(self, start_date=None, end_date=None):
+        import mmap
+
+        records = self._records(start_date, end_date)
+        heap = None
+        if os.path.exists(COLUMNAR_HEAP_FILE) and os.path.getsize(COLUMNAR_HEAP_FILE):
+            with open(COLUMNAR_HEAP_FILE, 'rb') as file:
+                heap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        for day, project, hundredths, comment_offset, comment_length in records:
+            comment = None
+            if comment_length:
+                comment = heap[comment_offset:comment_offset + comment_length].decode('utf-8')
+            yield (datetime.date.fromordinal(int(day)).strftime('%Y-%m-%d'),
+                   self.names[project], int(hundredths) / 100, comment)
+
+    def project_totals(self, start_date=None, end_date=None):
+        records = self._records(start_date, end_date)
+
+        numpy = load_numpy()
+        if numpy is not None:
+            sums = numpy.bincount(records['project'], weights=records['hundredths'],
+                                  minlength=len(self.names))
+            counts = numpy.bincount(records['project'], minlength=len(self.names))
+            return {self.names[i]: int(sums[i]) / 100 for i in numpy.flatnonzero(counts)}
+
+        sums = {}
+        for day, project, hundredths, comment_offset, comment_length in records:
+            sums[project] = sums.get(project, 0) + hundredths
+        return {self.names[i]: sums[i] / 100 for i in sorted(sums)}
+
+    def daily_totals(self, start_date=None, end_date=None):
+        records = self._records(start_date, end_date)
+        project_count = max(len(self.names), 1)
+
+        days = {}
+        numpy = load_numpy()
+        if numpy is not None:
+            if len(records) == 0:
+                return days
+            # one key per (day, project) so a single add.at sums every cell
+            first_day = int(records['day'].min())
+            keys = (records['day'].astype(numpy.int64) - first_day) * project_count + records['project']
+            cells, inverse = numpy.unique(keys, return_inverse=True)
+            sums = numpy.zeros(len(cells), dtype=numpy.int64)
+            numpy.add.at(sums, inverse, records['hundredths'])
+            daily_totals = None
+            current_day = None
+            for key, hundredths in zip(cells.tolist(), sums.tolist()):
+                day, project = divmod(key, project_count)
+                if day != current_day:
+                    # cells are sorted by day, format each date once
+                    date = datetime.date.fromordinal(first_day + day).strftime('%Y-%m-%d')
+                    daily_totals = days[date] = {}
+                    current_day = day
+                daily_totals[self.names[project]] = hundredths / 100
+            return days
+
+        sums = {}
+        for day, project, hundredths, comment_offset, comment_length in records:
+            sums[day, project] = sums.get((day, project), 0) + hundredths
+        for day, project in sorted(sums):
+            date = datetime.date.fromordinal(day).strftime('%Y-%m-%d')
+            days.setdefault(date, {})[self.names[project]] = sums[day, project] / 100
+        return days
+
+    #####
+    # purpose: one-shot conversion of time_log.txt into the columnar files
+    # inputs: none
+    # returns: number of entries converted
+    #####
+    def import_text_files(self):
+        return self.append_entries(TextStorage().iter_entries())
+
+#####
+# shards are summed in worker processes once the shards being read hold
+# at least this many entries, below that starting the pool costs more
+# than it saves
+#####
+SHARD_PARALLEL_MIN_ENTRIES = 100000
+SHARD_MANIFEST_VERSION = 1
+SHARD_IMPORT_BATCH = 100000
+
+#####
+# closed months (before the current one) are frozen into rollups.json as
+# per-project and per-date sums, stamped with the shard's size and mtime.
+# Reports covering a whole closed month use its rollup instead of reading
+# the shard. Only turned off to measure the cost of a full rescan.
+#####
+SHARD_ROLLUPS = True
+
+#####
+# purpose: reads the entries of one shard file in a date range
+# inputs: shard path, optional first and last date (YYYY-MM-DD)
+#####
+def read_shard(path, start_date=None, end_date=None):
+    try:
+        for offset, line in read_log_lines(path=path):
+            entry = parse_entry(line)
+            if entry is None:
+                continue
+            date = entry[0]
+            if (start_date is None or date >= start_date) and (end_date is None or date <= end_date):
+                yield entry
+    except FileNotFoundError:
+        # removed by hand since the manifest was written
+        return
+
+#####
+# purpose: sums one shard, runs in a worker process for parallel totals
+# inputs: shard path, optional first and last date (YYYY-MM-DD),
+#         by_day to split the hours by date as well
+# returns: {project: hours}, or {date: {project: hours}} with by_day
+#####
+def sum_shard(path, start_date=None, end_date=None, by_day=False):
+    totals = {}
+    days = {}
+    for date, project, hours, comment in read_shard(path, start_date, end_date):
+        if by_day:
+            add_to_totals(totals, days, date, project, hours)
+        else:
+            totals[project] = totals.get(project, 0) + hours
+    return days if by_day else totals
+
+#####
+# purpose: optional backend splitting the time log into one text file per
+#          month under time_log.shards, listed in manifest.json with their
+#          entry counts and first/last dates. Reports only open the shards
+#          overlapping the dates asked for, and large totals are summed one
+#          shard per worker process. Projects stay in projects.txt.
+#####
+class ShardedStorage(TextStorage):
+    name = 'sharded'
+
+    def __init__(self):
+        super().__init__()
+        self.rollups = {}
+        self.rollups_stamp = None
+        os.makedirs(SHARD_DIR, exist_ok=True)
+
+    def _shard_path(self, month):
+        return os.path.join(SHARD_DIR, month + '.txt')
+
+    #####
+    # purpose: loads the manifest, rebuilding it from the shard files if it
+    #          is missing or unreadable
+    # inputs: none
+    # returns: {'version': ..., 'shards': {month: {'entries', 'first', 'last'}}}
+    #####
+    def load_manifest(self):
+        try:
+            with open(SHARD_MANIFEST_FILE, 'r') as file:
+                manifest = json.load(file)
+            if isinstance(manifest, dict) and manifest.get('version') == SHARD_MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+
+        manifest = {'version': SHARD_MANIFEST_VERSION, 'shards': {}}
+        for file_name in sorted(os.listdir(SHARD_DIR)):
+            month, extension = os.path.splitext(file_name)
+            if extension != '.txt':
+                continue
+            dates = [entry[0] for entry in read_shard(self._shard_path(month))]
+            if dates:
+                manifest['shards'][month] = {'entries': len(dates), 'first': min(dates), 'last': max(dates)}
+        return manifest
+
+    # months and manifest records overlapping a date range, oldest first
+    def _shards(self, start_date=None, end_date=None):
+        shards = self.load_manifest()['shards']
+        return [(month, shard) for month, shard in sorted(shards.items())
+                if (start_date is None or shard['last'] >= start_date)
+                and (end_date is None or shard['first'] <= end_date)]
+
+    # appends each month's entries to its shard and updates the manifest,
+    # the manifest lock is held throughout so counts stay in step
+    def append_entries(self, entries):
+        months = {}
+        for entry in entries:
+            months.setdefault(entry[0][:7], []).append(entry)
+        if not months:
+            return 0
+
+        count = 0
+        with file_lock(SHARD_MANIFEST_FILE):
+            manifest = self.load_manifest()
+            for month, month_entries in sorted(months.items()):
+                append_lines(self._shard_path(month), (format_entry(*entry) for entry in month_entries))
+                first = min(entry[0] for entry in month_entries)
+                last = max(entry[0] for entry in month_entries)
+                shard = manifest['shards'].setdefault(month, {'entries': 0, 'first': first, 'last': last})
+                shard['entries'] += len(month_entries)
+                shard['first'] = min(shard['first'], first)
+                shard['last'] = max(shard['last'], last)
+                count += len(month_entries)
+            write_atomic(SHARD_MANIFEST_FILE, json.dumps(manifest))
+
+        # back-dated entries landed in frozen months, drop their rollups
+        self._drop_rollups(months)
+        return count
+
+    #####
+    # purpose: loads the rollups of closed months
+    # inputs: none
+    # returns: {month: {'stamp', 'totals', 'days'}}
+    #####
+    def load_rollups(self):
+        # reuse the last load while the file is unchanged
+        try:
+            stat = os.stat(SHARD_ROLLUP_FILE)
+        except FileNotFoundError:
+            return {}
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if self.rollups_stamp == stamp:
+            return self.rollups
+
+        try:
+            with open(SHARD_ROLLUP_FILE, 'r') as file:
+                rollups = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(rollups, dict):
+            return {}
+        self.rollups = rollups
+        self.rollups_stamp = stamp
+        return rollups
+
+    # size and mtime of a shard, a rollup is only used while they match
+    def _shard_stamp(self, month):
+        try:
+            stat = os.stat(self._shard_path(month))
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    #####
+    # purpose: adds and removes rollups under the rollup file's lock so
+    #          concurrent reports do not lose each other's updates
+    # inputs: {month: rollup} to store, months to drop
+    #####
+    def _update_rollups(self, new_rollups=None, dropped=()):
+        with file_lock(SHARD_ROLLUP_FILE):
+            rollups = dict(self.load_rollups())
+            rollups.update(new_rollups or {})
+            for month in dropped:
+                rollups.pop(month, None)
+            write_atomic(SHARD_ROLLUP_FILE, json.dumps(rollups))
+
+    def _drop_rollups(self, months):
+        if not os.path.exists(SHARD_ROLLUP_FILE):
+            return
+        current_month = datetime.date.today().strftime('%Y-%m')
+        dropped = [month for month in months if month < current_month]
+        if dropped and any(month in self.load_rollups() for month in dropped):
+            self._update_rollups(dropped=dropped)
+
+    def is_empty(self):
+        return not any(shard['entries'] for shard in self.load_manifest()['shards'].values())
+
+    # the manifest is rewritten on every append
+    def entries_stamp(self):
+        return file_stamp(SHARD_MANIFEST_FILE)
+
+    def iter_entries(self, start_date=None, end_date=None):
+        for month, shard in self._shards(start_date, end_date):
+            yield from read_shard(self._shard_path(month), start_date, end_date)
+
+    #####
+    # purpose: sums every shard overlapping a date range. Closed months the
+    #          range covers in full come from their rollup, building it if
+    #          it is missing or stale. The shards that have to be read are
+    #          summed on a process pool when there are enough entries to
+    #          make it worthwhile.
+    # inputs: optional first and last date (YYYY-MM-DD), by_day as for sum_shard
+    # returns: one sum_shard result per shard
+    #####
+    def _sum_shards(self, start_date, end_date, by_day):
+        rollups = self.load_rollups() if SHARD_ROLLUPS else {}
+        current_month = datetime.date.today().strftime('%Y-%m')
+        results = []
+        jobs = []
+        # (month, stamp) for each job building a rollup, None for the others
+        builds = []
+        entries = 0
+        for month, shard in self._shards(start_date, end_date):
+            whole = (start_date is None or start_date <= shard['first']) \
+                and (end_date is None or end_date >= shard['last'])
+            if SHARD_ROLLUPS and whole and month < current_month:
+                # stamp before reading, an append during the read makes it stale
+                stamp = self._shard_stamp(month)
+                rollup = rollups.get(month)
+                if rollup is not None and rollup['stamp'] == stamp:
+                    results.append(rollup['days' if by_day else 'totals'])
+                    continue
+                jobs.append((self._shard_path(month), None, None, True))
+                builds.append((month, stamp))
+            else:
+                jobs.append((self._shard_path(month), start_date, end_date, by_day))
+                builds.append(None)
+            entries += shard['entries']
+
+        if len(jobs) > 1 and entries >= SHARD_PARALLEL_MIN_ENTRIES:
+            import concurrent.futures
+            with concurrent.futures.ProcessPoolExecutor(min(len(jobs), os.cpu_count() or 1)) as pool:
+                sums = list(pool.map(sum_shard, *zip(*jobs)))
+        else:
+            sums = [sum_shard(*job) for job in jobs]
+
+        new_rollups = {}
+        for build, shard_sums in zip(builds, sums):
+            if build is None:
+                results.append(shard_sums)
+                continue
+            month, stamp = build
+            totals = {}
+            for daily_totals in shard_sums.values():
+                for project, hours in daily_totals.items():
+                    totals[project] = totals.get(project, 0) + hours
+            new_rollups[month] = {'stamp': stamp, 'totals': totals, 'days': shard_sums}
+            results.append(shard_sums if by_day else totals)
+        if new_rollups:
+            self._update_rollups(new_rollups)
+        return results
+
+    def project_totals(self, start_date=None, end_date=None):
+        totals = {}
+        for shard_totals in self._sum_shards(start_date, end_date, by_day=False):
+            for project, hours in shard_totals.items():
+                totals[project] = totals.get(project, 0) + hours
+        return totals
+
+    def daily_totals(self, start_date=None, end_date=None):
+        days = {}
+        # a date only ever lives in its own month's shard
+        for shard_days in self._sum_shards(start_date, end_date, by_day=True):
+            days.update(shard_days)
+        return days
+
+    #####
+    # purpose: one-shot migration of time_log.txt into monthly shards,
+    #          written in batches so memory stays flat
+    # inputs: none
+    # returns: number of entries converted
+    #####
+    def import_text_files(self):
+        count = 0
+        entries = TextStorage().iter_entries()
+        while True:
+            batch = list(itertools.islice(entries, SHARD_IMPORT_BATCH))
+            if not batch:
+                return count
+            count += self.append_entries(batch)
+
+#####
+# storage backends by name, picked with the TIMELYTRACK_STORAGE
+# environment variable
+#####
+STORAGE_BACKENDS = {
+    'text': TextStorage,
+    'sqlite': SqliteStorage,
+    'columnar': ColumnarStorage,
+    'sharded': ShardedStorage,
+}
+
+_storage = None
+
+#####
+# purpose: returns the storage backend in use, creating it on first use
+# inputs: none
+#####
+def get_storage():
+    global _storage
+    if _storage is None:
+        name = os.environ.get('TIMELYTRACK_STORAGE', 'text').lower()
+        if name not in STORAGE_BACKENDS:
+            raise ValueError(f'Unknown storage backend: {name}')
+        _storage = STORAGE_BACKENDS[name]()
+    return _storage
+
+#####
+# purpose: process-wide project list that loads once and reloads only when
+#          the storage's stat changes, so external edits are still seen.
+#          Keeps a set for O(1) lookups and duplicate rejection.
+# inputs: storage backend
+#####
+class ProjectRegistry:
+    def __init__(self, storage):
+        self.storage = storage
+        self.stamp = None
+        self.projects = []
+        self.names = set()
+        self._index = None
+
+    def _refresh(self):
+        stamp = self.storage.projects_stamp()
+        if stamp == self.stamp:
+            return
+        self._index = None
+        self.projects = []
+        self.names = set()
+        for name in self.storage.list_projects():
+            # older files may hold a name twice, keep the first
+            if name not in self.names:
+                self.projects.append(name)
+                self.names.add(name)
+        self.stamp = stamp
+
+    def __contains__(self, name):
+        self._refresh()
+        return name in self.names
+
+    def list(self):
+        self._refresh()
+        return list(self.projects)
+
+    # search index for the project picker, rebuilt when the list changes
+    def index(self):
+        self._refresh()
+        if self._index is None:
+            self._index = ProjectIndex(self.projects)
+        return self._index
+
+    def add(self, name):
+        name = name.strip()
+        if not name:
+            raise ValueError('Project name cannot be empty.')
+        if name in self:
+            raise ValueError(f"Project '{name}' already exists.")
+        self.storage.save_project(name)
+        # reload on next use in case another process also wrote
+        self.stamp = None
+
+    def remove(self, names):
+        self.storage.delete_projects(names)
+        self.stamp = None
+
+#####
+# purpose: search index over project names, a sorted list for prefix
+#          matches and a trigram index for substring matches, results are
+#          generated lazily so a page costs time in proportion to its size
+# inputs: project names in registry order
+#####
+class ProjectIndex:
+    def __init__(self, projects):
+        self.projects = projects
+        self.names = set(projects)
+        self.keys = sorted((name.lower(), name) for name in projects)
+        self.trigrams = None
+
+    def _build_trigrams(self):
+        self.trigrams = {}
+        for position, name in enumerate(self.projects):
+            lower = name.lower()
+            for trigram in {lower[i:i + 3] for i in range(len(lower) - 2)}:
+                self.trigrams.setdefault(trigram, []).append(position)
+
+    # names containing the text somewhere after the start, in registry order
+    def _substring_matches(self, text):
+        if len(text) < 3:
+            candidates = self.projects
+        else:
+            if self.trigrams is None:
+                self._build_trigrams()
+            # the rarest trigram of the text gives the fewest candidates
+            postings = min((self.trigrams.get(text[i:i + 3], []) for i in range(len(text) - 2)), key=len)
+            candidates = (self.projects[position] for position in postings)
+
+        for name in candidates:
+            lower = name.lower()
+            if text in lower and not lower.startswith(text):
+                yield name
+
+    # names starting with the text in alphabetical order, then the rest
+    def _matches(self, text):
+        if not text:
+            yield from self.projects
+            return
+
+        position = bisect.bisect_left(self.keys, (text,))
+        while position < len(self.keys) and self.keys[position][0].startswith(text):
+            yield self.keys[position][1]
+            position += 1
+        yield from self._substring_matches(text)
+
+    # matching names with the recently used ones first
+    def search(self, text, recent=()):
+        text = text.lower()
+        first = [name for name in recent if name in self.names and text in name.lower()]
+        yield from first
+        first = set(first)
+        for name in self._matches(text):
+            if name not in first:
+                yield name
+
+_registry = None
+
+#####
+# purpose: returns the project registry for the storage in use
+# inputs: none
+#####
+def get_registry():
+    global _registry
+    if _registry is None:
+        _registry = ProjectRegistry(get_storage())
+    return _registry
+
+#####
+# purpose: answers total hours per project for any date range from
+#          per-project running sums of whole hundredths, built once from
+#          the daily totals. A range total is two binary searches per
+#          project instead of a pass over the log.
+# inputs: daily totals {date: {project: hours}}
+#####
+class RangeTotals:
+    def __init__(self, days):
+        # per project, the dates it has hours on and the hundredths
+        # logged up to and including each of them
+        self.dates = {}
+        self.sums = {}
+        for date in sorted(days):
+            for project, hours in days[date].items():
+                sums = self.sums.setdefault(project, [0])
+                self.dates.setdefault(project, []).append(date)
+                sums.append(sums[-1] + round(hours * 100))
+
+    #####
+    # purpose: totals a date range
+    # inputs: first and last date (YYYY-MM-DD), both included, None for
+    #         an open end
+    # returns: {project: hours} for projects with hours in the range
+    #####
+    def totals(self, start_date, end_date):
+        totals = {}
+        for project, dates in self.dates.items():
+            first = bisect.bisect_left(dates, start_date) if start_date is not None else 0
+            last = bisect.bisect_right(dates, end_date) if end_date is not None else len(dates)
+            if last > first:
+                sums = self.sums[project]
+                totals[project] = (sums[last] - sums[first]) / 100
+        return totals
+
+_range_totals = None
+_range_totals_stamp = None
+
+#####
+# purpose: returns the range totals for the storage in use, rebuilt only
+#          when entries have been written since they were built
+# inputs: none
+#####
+def get_range_totals():
+    global _range_totals, _range_totals_stamp
+    storage = get_storage()
+    stamp = (storage.name, storage.entries_stamp())
+    if _range_totals is None or stamp != _range_totals_stamp:
+        _range_totals = RangeTotals(storage.daily_totals())
+        _range_totals_stamp = stamp
+    return _range_totals
+
+#####
+# purpose: first and last date of the current week, Monday to today
+# inputs: none
+# returns: (start date, end date) as YYYY-MM-DD
+#####
+def this_week_range():
+    today = datetime.date.today()
+    monday = today - datetime.timedelta(days=today.weekday())
+    return monday.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+
+#####
+# purpose: first and last date of the previous calendar month
+# inputs: none
+# returns: (start date, end date) as YYYY-MM-DD
+#####
+def last_month_range():
+    last_day = datetime.date.today().replace(day=1) - datetime.timedelta(days=1)
+    return last_day.replace(day=1).strftime('%Y-%m-%d'), last_day.strftime('%Y-%m-%d')
+
+#####
+# purpose: picks the dates shown in a report window
+# inputs: dates with entries, number of most recent dates to keep,
+#         or an explicit first/last date (YYYY-MM-DD) which takes precedence
+# returns: dates in descending order
+#####
+def select_dates(dates, days=14, start_date=None, end_date=None):
+    sorted_dates = sorted(dates, reverse=True)
+    if start_date is not None or end_date is not None:
+        return [date for date in sorted_dates
+                if (start_date is None or date >= start_date)
+                and (end_date is None or date <= end_date)]
+    return sorted_dates[:days]
+
+#####
+# report output is collected and written to the terminal in chunks of
+# about this many characters instead of a print per line
+#####
+RENDER_CHUNK_SIZE = 64 * 1024
+
+#####
+# purpose: collects report output and writes it in large chunks, the rest
+#          is written when the with block ends
+# inputs: stream to write to, stdout by default
+#####
+class ReportBuffer:
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.parts = []
+        self.size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= RENDER_CHUNK_SIZE:
+            self.flush()
+
+    def line(self, text=''):
+        self.write(text + '\n')
+
+    # title between two rules as long as it
+    def heading(self, title):
+        rule = '-' * len(title)
+        self.write(f'{rule}\n{title}\n{rule}\n')
+
+    def flush(self):
+        stream = self.stream or sys.stdout
+        if self.parts:
+            stream.write(''.join(self.parts))
+            self.parts = []
+            self.size = 0
+        stream.flush()
+
+#####
+# screen lines kept free below a time log page for the status and prompt
+#####
+PAGER_RESERVED_LINES = 5
+
+#####
+# purpose: pages through the time log, reading entries from the storage
+#          only as pages are first shown. Pages already seen are kept as
+#          entries for paging back, only the page on screen is formatted.
+# inputs: storage backend, screen lines per page
+#####
+class TimeLogPager:
+    def __init__(self, storage, lines):
+        self.storage = storage
+        self.lines = lines
+        self.jump(None)
+
+    # starts over at a date (YYYY-MM-DD), None for the start of the log
+    def jump(self, start_date):
+        self.entries = iter(self.storage.iter_entries(start_date))
+        # the entry that did not fit on the last page read
+        self.pending = None
+        self.at_end = False
+        self.pages = []
+        self.page = -1
+        self.next_page()
+
+    # reads entries until the page is full, a new date takes 3 lines more
+    def _read_page(self):
+        page = []
+        used = 0
+        current_date = None
+        while True:
+            entry = self.pending if self.pending is not None else next(self.entries, None)
+            self.pending = None
+            if entry is None:
+                self.at_end = True
+                return page
+            needed = 1 if entry[0] == current_date else 4
+            if page and used + needed > self.lines:
+                self.pending = entry
+                return page
+            page.append(entry)
+            used += needed
+            current_date = entry[0]
+
+    def next_page(self):
+        if self.page + 1 < len(self.pages):
+            self.page += 1
+        elif not self.at_end:
+            page = self._read_page()
+            if page:
+                self.pages.append(page)
+                self.page += 1
+
+    def previous_page(self):
+        if self.page > 0:
+            self.page -= 1
+
+    def current(self):
+        return self.pages[self.page] if self.page >= 0 else []
+
+    # a page is only cut short by the next entry or the end of the log
+    def is_last(self):
+        return self.at_end and self.page + 1 == len(self.pages)
+
+#####
+# purpose: writes a page of entries under their date headings
+# inputs: report buffer, entries
+#####
+def render_log_page(out, page):
+    current_date = None
+    for date, project, hours, comment in page:
+        if date != current_date:
+            # Display timestamped entries under 'Time Log' section
+            out.heading(f'{date} Time Log')
+            current_date = date
+
+        # Display timestamped entry
+        out.write(format_legacy_entry(date, project, hours, comment))
+
+#####
+# purpose: shows the time log a page at a time, with paging back and
+#          jumping to a date
+# inputs: none
+#####
+def display_time_log():
+    import shutil
+
+    clear_screen()
+
+    lines = max(shutil.get_terminal_size().lines - PAGER_RESERVED_LINES, 10)
+    pager = TimeLogPager(get_storage(), lines)
+    message = ''
+    while True:
+        with ReportBuffer() as out:
+            page = pager.current()
+            if page:
+                render_log_page(out, page)
+                status = f'\nPage {pager.page + 1}'
+                out.line(status + (' (end of log)' if pager.is_last() else ''))
+            else:
+                out.line('\nNo time log entries to show.')
+            if message:
+                out.line(message)
+                message = ''
+
+        choice = input('[Enter] next, p previous, d YYYY-MM-DD jump to date, 0 back\n~>').strip().lower()
+        if choice == '0':
+            break
+        elif choice in ('', 'n'):
+            pager.next_page()
+        elif choice == 'p':
+            pager.previous_page()
+        elif choice.startswith('d'):
+            try:
+                date = parse_date(choice[1:].strip())
+            except ValueError:
+                message = 'Dates look like 2024-01-31.'
+            else:
+                pager.jump(date)
+        else:
+            message = 'Invalid choice. Please try again.'
+        clear_screen()
 
-    # wait for the user to press any key
-    input('\n Press Enter to return to the Previous Menu...')
     # clear the screen before returning to the main menu
     clear_screen()
 
@@ -348,38 +2594,19 @@ def display_time_log():
 # inputs: time entries
 #####
 def display_total_time_worked():
-    with open('time_log.txt', 'r') as file:
-        time_log = file.readlines()
-
     clear_screen()
 
-    if not time_log:
+    if get_storage().is_empty():
         print('\nNo time log entries yet.')
         return
 
-    total_time_worked = {}
-
-    # loop through entries in time log
-    for entry in time_log:
-        # split each entry into timestamp and data parts
-        parts = entry.strip().split(' - ', 1)
-        if len(parts) == 2:
-            entry_data = parts[1]
-
-            # Process 'Time Log' entries for calculating totals
-            project, hours = entry_data.split(': ')
-            hours = float(hours.split()[0])
-
-            if project in total_time_worked:
-                total_time_worked[project] += hours
-            else:
-                total_time_worked[project] = hours
+    total_time_worked = get_storage().project_totals()
 
     # Display grand totals
-    print('-' * len('Total Time Worked') + '\nTotal Time Worked')
-    print('-' * len('Total Time Worked'))
-    for project, hours in total_time_worked.items():
-        print(f'{project}: {hours} hours')
+    with ReportBuffer() as out:
+        out.heading('Total Time Worked')
+        for project, hours in total_time_worked.items():
+            out.line(f'{project}: {hours} hours')
     
     # wait for the user to press any key
     input('\n Press Enter to return to the Previous Menu...')
@@ -393,59 +2620,27 @@ def display_total_time_worked():
 def display_today_totals():
     today = datetime.date.today().strftime("%Y-%m-%d")
 
-    with open('time_log.txt', 'r') as file:
-        time_log = file.readlines()
-
     clear_screen()
 
-    if not time_log:
+    if get_storage().is_empty():
         print("\nNo time log entries yet for Today.")
         return
 
-    total_time_worked = {}
-    daily_totals = {}
+    today_log = aggregate_time_log(today, today, keep_entries=True)
+    daily_totals = today_log['days'].get(today, {})
     
-    print("-" * len(f"{today} Today's Totals") + f"\n{today} Today's Totals")
-    print("-" * len(f"{today} Today's Totals"))
-    
-    # Loop through entries in time log
-    for entry in time_log:
-        parts = entry.strip().split(' - ', 1)
-        if len(parts) == 2:
-            timestamp, entry_data = parts
-
-            # Extract date from timestamp
-            date = timestamp.split()[0]
-
-            if date != today:
-                continue
-
-            # Process "Time Log" entries for calculating totals
-            project_hours, *comment = entry_data.split(' - ')
-            project, hours = project_hours.split(': ')
-            hours = float(hours.split()[0])
-
-            # Extract comment if present
-            comment_text = " ".join(comment).strip() if comment else None
-
-            if project in total_time_worked:
-                total_time_worked[project] += hours
-            else:
-                total_time_worked[project] = hours
-
-            if project in daily_totals:
-                daily_totals[project] += hours
-            else:
-                daily_totals[project] = hours
+    with ReportBuffer() as out:
+        out.heading(f"{today} Today's Totals")
 
+        for date, project, hours, comment in today_log['entries']:
             # Display project name and hours worked
-            print(f"{project}: {hours} hours")
-            
+            out.line(f"{project}: {hours} hours")
+
             # Display comment if present
-            if comment_text:
-                print(f"{' ' * len(project)}  ∟ {comment_text}")
+            if comment:
+                out.line(f"{' ' * len(project)}  ∟ {comment}")
 
-    print("\nTotal Hours Worked:", sum(daily_totals.values()), "hours")
+        out.line(f"\nTotal Hours Worked: {sum(daily_totals.values())} hours")
 
     # Wait for the user to press any key
     input('\nPress Enter to return to the Previous Menu...')
@@ -454,83 +2649,285 @@ def display_today_totals():
 
 
 #####
-# purpose: display all entries by date
-# inputs: none
+# purpose: display totals by date for the most recent dates or a date range
+# inputs: number of most recent dates to show, or first/last date (YYYY-MM-DD)
 ##### 
-def display_historic_totals():
-    with open('time_log.txt', 'r') as file:
-        time_log = file.readlines()
-
+def display_historic_totals(days=14, start_date=None, end_date=None):
     clear_screen()
 
-    if not time_log:
+    if get_storage().is_empty():
         print('\nNo time log entries yet')
         return
 
-    total_time_worked = {}
-    daily_totals = {}
-    grand_totals = {}
-
-    # Get unique dates from the time log
-    unique_dates = set()
-    for entry in time_log:
-        parts = entry.strip().split(' - ', 1)
-        if len(parts) == 2:
-            timestamp = parts[0]
-            date = timestamp.split()[0]
-            unique_dates.add(date)
-
-    # Sort unique dates in descending order
-    sorted_dates = sorted(unique_dates, reverse=True)
-
-    # Display historic totals for the last 14 days
-    for date in sorted_dates[:14]:
-        # loop through entries in time log
-        for entry in time_log:
-            parts = entry.strip().split(' - ', 1)
-            if len(parts) == 2:
-                timestamp, entry_data = parts
-
-                # Extract date from timestamp
-                entry_date = timestamp.split()[0]
-
-                if entry_date != date:
-                    continue
+    # Daily totals come from the storage backend in one query
+    daily_log = get_storage().daily_totals(start_date, end_date)
 
-                # Process 'Time Log' entries for calculating totals
-                project, hours = entry_data.split(': ')
-                hours = float(hours.split()[0])
+    with ReportBuffer() as out:
+        for date in select_dates(daily_log, days, start_date, end_date):
+            daily_totals = daily_log[date]
 
-                if project in total_time_worked:
-                    total_time_worked[project] += hours
-                else:
-                    total_time_worked[project] = hours
+            out.heading(f'{date} Historic Totals')
 
-                if project in daily_totals:
-                    daily_totals[project] += hours
-                else:
-                    daily_totals[project] = hours
+            # Display daily totals for the date
+            for project, hours in daily_totals.items():
+                out.line(f'{project}: {hours} hours')
 
-        print('-' * len(f'{date} Historic Totals') + f'\n{date} Historic Totals')
-        print('-' * len(f'{date} Historic Totals'))
+            # Display total hours worked for the date
+            total_hours = sum(daily_totals.values())
+            out.line(f' Total Hours Worked: {total_hours} hours\n')
 
-        # Display daily totals for the date
-        for project, hours in daily_totals.items():
-            print(f'{project}: {hours} hours')
-            grand_totals[project] = grand_totals.get(project, 0) + hours
+    # wait for the user to press any key
+    input('\n Press Enter to return to the Previous Menu...')
+    # clear the screen before returning to the main menu
+    clear_screen()
+
+#####
+# purpose: display total hours per project for a date range
+# inputs: first and last date (YYYY-MM-DD), report title
+#####
+def display_range_totals(start_date, end_date, title):
+    clear_screen()
+
+    if get_storage().is_empty():
+        print('\nNo time log entries yet.')
+        return
 
-        # Display total hours worked for the date
-        total_hours = sum(daily_totals.values())
-        print(f' Total Hours Worked: {total_hours} hours\n')
+    totals = get_range_totals().totals(start_date, end_date)
 
-        # Reset daily totals for the next date
-        daily_totals = {}
+    with ReportBuffer() as out:
+        out.heading(f'{title}: {start_date} to {end_date}')
+        if not totals:
+            out.line('No time logged in this range.')
+        for project, hours in sorted(totals.items()):
+            out.line(f'{project}: {hours} hours')
+        out.line(f'\nTotal Hours Worked: {round(sum(totals.values()), 2)} hours')
 
     # wait for the user to press any key
     input('\n Press Enter to return to the Previous Menu...')
     # clear the screen before returning to the main menu
     clear_screen()
 
+#####
+# purpose: asks for a date range and displays its totals
+# inputs: first and last date
+#####
+def custom_range_totals():
+    start_date = input('\nFrom date (YYYY-MM-DD)\n~>').strip()
+    end_date = input('To date (YYYY-MM-DD, Enter for today)\n~>').strip() \
+        or datetime.date.today().strftime('%Y-%m-%d')
+    try:
+        start_date = parse_date(start_date)
+        end_date = parse_date(end_date)
+    except ValueError:
+        print('Dates look like 2024-01-31. Please try again.')
+        return
+    if start_date > end_date:
+        print('The from date must not be after the to date. Please try again.')
+        return
+    display_range_totals(start_date, end_date, 'Custom Range')
+
+#####
+# the dashboard checks for new entries at this cadence in seconds when
+# it cannot be woken by inotify, and redraws at most this often
+#####
+DASHBOARD_POLL_INTERVAL = 1.0
+DASHBOARD_REDRAW_INTERVAL = 0.5
+
+#####
+# inotify event flags for changes to files in the watched folder
+#####
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+
+#####
+# purpose: watches a file's folder with inotify, so appends, rewrites and
+#          renames over the file all wake the dashboard
+# inputs: file path
+# returns: non-blocking inotify file descriptor, or None where inotify is
+#          not available
+#####
+def open_inotify(path):
+    if not sys.platform.startswith('linux'):
+        return None
+    import ctypes
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    directory = os.path.dirname(os.path.abspath(path)).encode()
+    mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    if libc.inotify_add_watch(fd, directory, mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+#####
+# purpose: reads every queued inotify event
+# inputs: inotify file descriptor
+# returns: True if there were any
+#####
+def drain_inotify(fd):
+    events = False
+    while True:
+        try:
+            if not os.read(fd, 4096):
+                return events
+        except BlockingIOError:
+            return events
+        events = True
+
+#####
+# purpose: follows time_log.txt from the last offset read, keeping the
+#          totals in memory. Appended lines are parsed as they arrive and
+#          a truncated or rewritten log is read again from the start.
+#####
+class LogFollower:
+    source = 'time_log.txt'
+
+    def __init__(self):
+        # start from the report cache so only bytes after it are parsed
+        self.cache = refresh_time_log_cache(days=True)
+
+    # reads anything new, returns True if the totals may have changed
+    def poll(self):
+        try:
+            stat = os.stat(TIME_LOG_FILE)
+        except FileNotFoundError:
+            # being replaced, pick it up on the next poll
+            return False
+        if (stat.st_size, stat.st_mtime_ns, stat.st_ino) == \
+                (self.cache['size'], self.cache['mtime'], self.cache['inode']):
+            return False
+        self.cache = update_time_log_cache(self.cache, stat)
+        return True
+
+    def totals(self):
+        return self.cache['totals']
+
+    def day_totals(self, date):
+        return self.cache['days'].get(date, {})
+
+    def iter_entries(self, start_date=None, end_date=None):
+        return read_time_log(start_date, end_date, self.cache)
+
+    def daily_totals(self, start_date=None, end_date=None):
+        return {date: daily_totals for date, daily_totals in self.cache['days'].items()
+                if (start_date is None or date >= start_date)
+                and (end_date is None or date <= end_date)}
+
+#####
+# purpose: follows the other storage backends, querying the totals again
+#          whenever their entries_stamp changes
+# inputs: storage backend
+#####
+class StorageFollower:
+    def __init__(self, storage):
+        self.storage = storage
+        self.source = f'{storage.name} storage'
+        self.stamp = None
+        self.poll()
+
+    def poll(self):
+        stamp = self.storage.entries_stamp()
+        if stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        self.project_totals = self.storage.project_totals()
+        self.days = {}
+        return True
+
+    def totals(self):
+        return self.project_totals
+
+    def day_totals(self, date):
+        if date not in self.days:
+            self.days[date] = self.storage.daily_totals(date, date).get(date, {})
+        return self.days[date]
+
+    def iter_entries(self, start_date=None, end_date=None):
+        return self.storage.iter_entries(start_date, end_date)
+
+    def daily_totals(self, start_date=None, end_date=None):
+        return self.storage.daily_totals(start_date, end_date)
+
+#####
+# purpose: draws the dashboard
+# inputs: follower, today's date, how changes are noticed
+#####
+def render_dashboard(follower, today, watching):
+    clear_screen()
+    with ReportBuffer() as out:
+        out.heading(f'Dashboard, updated {datetime.datetime.now().strftime("%H:%M:%S")}')
+
+        today_totals = follower.day_totals(today)
+        out.line(f"\n{today} Today's Totals")
+        for project, hours in sorted(today_totals.items()):
+            out.line(f'{project}: {round(hours, 2)} hours')
+        out.line(f' Total Hours Worked: {round(sum(today_totals.values()), 2)} hours')
+
+        totals = follower.totals()
+        out.line('\nTotal Time Worked')
+        for project, hours in sorted(totals.items()):
+            out.line(f'{project}: {round(hours, 2)} hours')
+
+        out.line(f'\nFollowing {follower.source} ({watching}). Press Enter to return.')
+
+#####
+# purpose: live totals that follow entries logged from other terminals or
+#          scripts, redrawn when they change but at most every
+#          DASHBOARD_REDRAW_INTERVAL seconds
+# inputs: none
+#####
+def display_dashboard():
+    storage = get_storage()
+    if storage.name == 'text':
+        follower = LogFollower()
+        watch_fd = open_inotify(TIME_LOG_FILE)
+    else:
+        follower = StorageFollower(storage)
+        watch_fd = None
+    watching = 'inotify' if watch_fd is not None else 'polling'
+
+    today = None
+    changed = True
+    last_draw = 0.0
+    try:
+        with timer_keyboard():
+            while True:
+                if datetime.date.today().strftime('%Y-%m-%d') != today:
+                    today = datetime.date.today().strftime('%Y-%m-%d')
+                    changed = True
+
+                now = time.monotonic()
+                if changed and now - last_draw >= DASHBOARD_REDRAW_INTERVAL:
+                    render_dashboard(follower, today, watching)
+                    changed = False
+                    last_draw = now
+
+                # a pending redraw waits out the redraw interval, with inotify
+                # changes end the wait early
+                if changed:
+                    timeout = last_draw + DASHBOARD_REDRAW_INTERVAL - now
+                else:
+                    timeout = DASHBOARD_POLL_INTERVAL
+                if wait_for_enter(timeout, watch_fd):
+                    break
+
+                if watch_fd is None or drain_inotify(watch_fd):
+                    changed = follower.poll() or changed
+    finally:
+        if watch_fd is not None:
+            os.close(watch_fd)
+
+    clear_screen()
+
 #####
 # purpose: display time menu options
 # inputs: menu options
@@ -545,6 +2942,10 @@ def time_menu():
         print('2. Total Time Worked')
         print('3. Historic Totals')
         print('4. Time Log')
+        print('5. This Week')
+        print('6. Last Month')
+        print('7. Custom Range')
+        print('8. Live Dashboard')
         print('0. Back to Main Menu')
         
         choice = input('\nEnter your choice\n~>')
@@ -557,6 +2958,14 @@ def time_menu():
             display_historic_totals()
         elif choice == '4':
             display_time_log()
+        elif choice == '5':
+            display_range_totals(*this_week_range(), 'This Week')
+        elif choice == '6':
+            display_range_totals(*last_month_range(), 'Last Month')
+        elif choice == '7':
+            custom_range_totals()
+        elif choice == '8':
+            display_dashboard()
         elif choice == '0':
             clear_screen()
             break
@@ -593,14 +3002,207 @@ def main_menu():
             print('Invalid choice. Please try again.')
 
 #####
-# function: calls functions
-# purpose: runs program 
+# purpose: starts a timer from the command line, kept in the timer
+#          checkpoint so 'stop' can log it later
+# inputs: parsed arguments
+#####
+def cli_start(args):
+    if args.project not in get_registry():
+        raise ValueError(f'unknown project {args.project!r}')
+    name = args.name or args.project
+    with file_lock(TIMER_CHECKPOINT_FILE):
+        records = load_timer_checkpoint()
+        if any((record['name'] or record['project']) == name for record in records):
+            raise ValueError(f'a timer named {name!r} is already running')
+        record = Timer(args.project).to_record(name)
+        record['owner'] = CLI_TIMER_OWNER
+        records.append(record)
+        save_timer_checkpoint(records)
+    print(f'Started {name}.')
+
+#####
+# purpose: stops a checkpointed timer and logs its time
+# inputs: parsed arguments
+#####
+def cli_stop(args):
+    owner = checkpoint_owner()
+    with file_lock(TIMER_CHECKPOINT_FILE):
+        records = load_timer_checkpoint()
+        if args.timer is None:
+            # timers the menus are running are stopped there
+            stoppable = [record for record in records
+                         if record.get('owner') == CLI_TIMER_OWNER or timer_abandoned(record, owner)]
+            if len(stoppable) != 1:
+                raise ValueError(f'{len(stoppable)} timers can be stopped here, name the one to stop')
+            record = stoppable[0]
+        else:
+            matches = [record for record in records if (record['name'] or record['project']) == args.timer]
+            if not matches:
+                raise ValueError(f'no timer named {args.timer!r} is running')
+            record = matches[0]
+            if record.get('owner') != CLI_TIMER_OWNER and not timer_abandoned(record, owner):
+                raise ValueError(f'{args.timer!r} is running in TimelyTrack on {record["owner"]}, stop it there')
+
+        hours = Timer.from_record(record).hours()
+        today = datetime.date.today().strftime('%Y-%m-%d')
+        log_entries([(today, record['project'], hours, args.comment)])
+        records.remove(record)
+        save_timer_checkpoint(records)
+    print(f'Logged {hours} hours to {record["project"]}.')
+
 #####
-def main():
+# purpose: lists the checkpointed timers
+# inputs: parsed arguments
+#####
+def cli_status(args):
+    records = load_timer_checkpoint()
+    if not records:
+        print('No timers running.')
+    for record in records:
+        timer = Timer.from_record(record)
+        state = 'paused' if timer.paused else 'running'
+        print(f'{record["name"] or record["project"]} ({record["project"]}): {timer.hours()} hours [{state}]')
+
+#####
+# purpose: logs time from the command line
+# inputs: parsed arguments
+#####
+def cli_log(args):
+    date = args.date or datetime.date.today().strftime('%Y-%m-%d')
+    log_entries([(date, args.project, args.hours, args.comment)])
+    print(f'Logged {round(args.hours, 2)} hours to {args.project}.')
+
+#####
+# purpose: prints total hours per project, optionally for a date range
+# inputs: parsed arguments
+#####
+def cli_report(args):
+    since = parse_date(args.since) if args.since else None
+    until = parse_date(args.until) if args.until else None
+    totals = get_storage().project_totals(since, until)
+    with ReportBuffer() as out:
+        for project, hours in sorted(totals.items()):
+            out.line(f'{project}: {round(hours, 2)} hours')
+        out.line(f'Total: {round(sum(totals.values()), 2)} hours')
+
+#####
+# purpose: serves totals as JSON on a local port, see timely_server
+# inputs: parsed arguments
+#####
+def cli_serve(args):
+    import timely_server
+
+    timely_server.serve(args.host, args.port, args.verbose)
+
+#####
+# command line commands by name
+#####
+CLI_COMMANDS = {
+    'start': cli_start,
+    'stop': cli_stop,
+    'status': cli_status,
+    'log': cli_log,
+    'report': cli_report,
+    'serve': cli_serve,
+}
+
+#####
+# purpose: runs one command without the menus, for shell scripts and
+#          editor hooks
+# inputs: command line arguments
+# returns: exit status
+#####
+def run_cli(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='timely_track',
+                                     description='Track billable time. Run without a command for the menus.')
+    parser.add_argument('--trace', metavar='FILE', help='add a JSON line of phase timings per command to FILE')
+    parser.add_argument('--profile', metavar='FOLDER', help='save a cProfile dump per command in FOLDER')
+    commands = parser.add_subparsers(dest='command')
+
+    start = commands.add_parser('start', help='start a timer')
+    start.add_argument('project')
+    start.add_argument('--name', help='timer name, defaults to the project')
+
+    stop = commands.add_parser('stop', help='stop a timer and log its time')
+    stop.add_argument('timer', nargs='?', help='timer name, needed when several are running')
+    stop.add_argument('-m', '--comment')
+
+    commands.add_parser('status', help='list running timers')
+
+    log = commands.add_parser('log', help='log time without a timer')
+    log.add_argument('project')
+    log.add_argument('hours', type=float)
+    log.add_argument('--date', help='YYYY-MM-DD, defaults to today')
+    log.add_argument('-m', '--comment')
+
+    report = commands.add_parser('report', help='total hours per project')
+    report.add_argument('--since', help='first date, YYYY-MM-DD')
+    report.add_argument('--until', help='last date, YYYY-MM-DD')
+
+    serve = commands.add_parser('serve', help='serve totals as JSON on a local port')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--verbose', action='store_true', help='log every request')
+
+    args = parser.parse_args(argv)
+    instrument(args.trace, args.profile)
+    if args.command is None:
+        run_menus()
+        return 0
+
+    check_files(interactive=False)
+    try:
+        CLI_COMMANDS[args.command](args)
+    except ValueError as error:
+        print(f'timely_track: {error}', file=sys.stderr)
+        return 1
+    return 0
+
+#####
+# purpose: turns on timing of the reports and commands when a trace file
+#          or profile folder is given here or in TIMELYTRACK_TRACE and
+#          TIMELYTRACK_PROFILE, see timely_instrument. Otherwise nothing
+#          is imported or wrapped.
+# inputs: trace file path, cProfile dump folder
+#####
+def instrument(trace_path=None, profile_dir=None):
+    trace_path = trace_path or os.environ.get('TIMELYTRACK_TRACE')
+    profile_dir = profile_dir or os.environ.get('TIMELYTRACK_PROFILE')
+    if not trace_path and not profile_dir:
+        return
+    import timely_instrument
+
+    # a profile without a trace file still gets its trace lines, next to it
+    if not trace_path:
+        os.makedirs(profile_dir, exist_ok=True)
+        trace_path = os.path.join(profile_dir, 'trace.jsonl')
+    timely_instrument.instrument(sys.modules[__name__], trace_path, profile_dir)
+
+#####
+# purpose: runs the menus
+# inputs: none
+#####
+def run_menus():
     clear_screen()
     check_files()
+    recover_timers()
     main_menu()
 
+#####
+# function: calls functions
+# purpose: runs a command line command, or the menus without one
+# inputs: command line arguments
+#####
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return run_cli(argv)
+
+    instrument()
+    run_menus()
+
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())